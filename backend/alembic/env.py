@@ -15,6 +15,9 @@ from app.core.config import settings  # noqa: E402
 from app.models.base import Base  # noqa: E402
 import app.models.search  # noqa: E402,F401
 import app.models.itinerary  # noqa: E402,F401
+import app.models.hotel  # noqa: E402,F401
+import app.models.rate_limit  # noqa: E402,F401
+import app.models.fx  # noqa: E402,F401
 
 config = context.config
 
@@ -0,0 +1,46 @@
+"""add hotel reference cache
+
+Revision ID: 0003_add_hotel_reference_cache
+Revises: 0002_add_itinerary_tables
+Create Date: 2026-10-17 09:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_add_hotel_reference_cache"
+down_revision = "0002_add_itinerary_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hotel_reference",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("city_code", sa.String(length=3), nullable=False),
+        sa.Column("ratings_key", sa.String(length=20), nullable=False),
+        sa.Column("hotels_json", sa.JSON(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            server_onupdate=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.UniqueConstraint("city_code", "ratings_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("hotel_reference")
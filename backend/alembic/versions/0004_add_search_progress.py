@@ -0,0 +1,24 @@
+"""add search progress
+
+Revision ID: 0004_add_search_progress
+Revises: 0003_add_hotel_reference_cache
+Create Date: 2026-10-17 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004_add_search_progress"
+down_revision = "0003_add_hotel_reference_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("search_request", sa.Column("progress_json", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("search_request", "progress_json")
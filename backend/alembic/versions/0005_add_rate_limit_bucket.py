@@ -0,0 +1,29 @@
+"""add rate limit bucket
+
+Revision ID: 0005_add_rate_limit_bucket
+Revises: 0004_add_search_progress
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_add_rate_limit_bucket"
+down_revision = "0004_add_search_progress"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_bucket",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("tokens", sa.Double(), nullable=False),
+        sa.Column("refilled_at", sa.Double(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_bucket")
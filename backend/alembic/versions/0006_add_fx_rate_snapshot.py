@@ -0,0 +1,30 @@
+"""add fx rate snapshot
+
+Revision ID: 0006_add_fx_rate_snapshot
+Revises: 0005_add_rate_limit_bucket
+Create Date: 2026-10-17 14:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_add_fx_rate_snapshot"
+down_revision = "0005_add_rate_limit_bucket"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fx_rate_snapshot",
+        sa.Column("base_currency", sa.String(length=3), primary_key=True),
+        sa.Column("rates_json", sa.JSON(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fx_rate_snapshot")
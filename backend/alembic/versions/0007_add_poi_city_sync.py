@@ -0,0 +1,29 @@
+"""add poi city sync
+
+Revision ID: 0007_add_poi_city_sync
+Revises: 0006_add_fx_rate_snapshot
+Create Date: 2026-10-17 15:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_add_poi_city_sync"
+down_revision = "0006_add_fx_rate_snapshot"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "poi_city_sync",
+        sa.Column("city_code", sa.String(length=3), primary_key=True),
+        sa.Column("poi_count", sa.Integer(), nullable=False),
+        sa.Column("synced_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("poi_city_sync")
@@ -0,0 +1,31 @@
+"""add poi ingest tile
+
+Revision ID: 0008_add_poi_ingest_tile
+Revises: 0007_add_poi_city_sync
+Create Date: 2026-10-17 16:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008_add_poi_ingest_tile"
+down_revision = "0007_add_poi_city_sync"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "poi_ingest_tile",
+        sa.Column("city_code", sa.String(length=3), primary_key=True),
+        sa.Column("grid", sa.Integer(), primary_key=True),
+        sa.Column("tile_index", sa.Integer(), primary_key=True),
+        sa.Column("poi_count", sa.Integer(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("poi_ingest_tile")
@@ -0,0 +1,24 @@
+"""add poi content hash
+
+Revision ID: 0009_add_poi_content_hash
+Revises: 0008_add_poi_ingest_tile
+Create Date: 2026-10-17 17:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_add_poi_content_hash"
+down_revision = "0008_add_poi_ingest_tile"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("poi", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("poi", "content_hash")
@@ -0,0 +1,27 @@
+"""add poi city sync version
+
+Revision ID: 0010_add_poi_city_sync_version
+Revises: 0009_add_poi_content_hash
+Create Date: 2026-10-17 18:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010_add_poi_city_sync_version"
+down_revision = "0009_add_poi_content_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "poi_city_sync",
+        sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("poi_city_sync", "version")
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from app.core.single_flight import SingleFlight
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TtlLruCache(Generic[K, V]):
+    """Process-local cache with a per-entry TTL and an LRU size bound.
+
+    ``max_entries <= 0`` disables the cache: every lookup misses and nothing is stored.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: SingleFlight[K, V] = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._ttl_seconds > 0
+
+    def get(self, key: K, accept: Callable[[V], bool] | None = None) -> V | None:
+        """Return the live entry for ``key``; entries rejected by ``accept`` count as misses."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            if accept is not None and not accept(entry[1]):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self._ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: K,
+        loader: Callable[[], Awaitable[V]],
+        accept: Callable[[V], bool] | None = None,
+    ) -> V:
+        """Return the cached value or await ``loader`` once for concurrent misses on ``key``.
+
+        ``accept`` lets a caller reject an entry that is live but not good enough for
+        it; the reload then replaces the entry.
+        """
+        cached = self.get(key, accept)
+        if cached is not None:
+            return cached
+
+        async def load() -> V:
+            value = await loader()
+            self.set(key, value)
+            return value
+
+        value = await self._inflight.run(key, load)
+        if accept is not None and not accept(value):
+            # Joined a concurrent load made for a narrower request.
+            value = await load()
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+class ProviderCallBudgetExceeded(RuntimeError):
+    """Raised instead of making a provider call once the current budget is spent."""
+
+
+class CallBudget:
+    """Counter of outbound provider calls shared by every task of one search."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def consume(self) -> None:
+        with self._lock:
+            if self.used >= self.limit:
+                raise ProviderCallBudgetExceeded(
+                    f"provider call budget of {self.limit} exhausted"
+                )
+            self.used += 1
+
+
+_current_budget: ContextVar[CallBudget | None] = ContextVar(
+    "provider_call_budget", default=None
+)
+
+
+@contextmanager
+def provider_call_budget(limit: int) -> Iterator[CallBudget | None]:
+    """Bound provider calls made in this context; ``limit <= 0`` means unbounded.
+
+    Tasks and threads started inside the block copy the context, so they all draw on
+    the same budget.
+    """
+    budget = CallBudget(limit) if limit > 0 else None
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def consume_provider_call() -> None:
+    budget = _current_budget.get()
+    if budget is not None:
+        budget.consume()
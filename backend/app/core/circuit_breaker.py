@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+from app.core.providers import provider_for_url
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker counting consecutive failed provider requests.
+
+    After ``failure_threshold`` failures in a row the breaker opens and calls fail fast
+    for ``reset_seconds``. Then one probe call is let through (half-open): success
+    closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, name: str, *, failure_threshold: int, reset_seconds: float) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected without reaching the provider."""
+        return self.state == "open"
+
+    def before_call(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit breaker is open")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._probing or (
+                self._state == "closed" and self._failures >= self._failure_threshold
+            ):
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self.opened += 1
+            self._probing = False
+
+    def cancel_call(self) -> None:
+        """Release a half-open probe that ended without reaching the provider."""
+        with self._lock:
+            self._probing = False
+
+    def _current_state(self) -> str:
+        if self._state == "open" and time.monotonic() - self._opened_at >= self._reset_seconds:
+            return "half_open"
+        return self._state
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+circuit_breakers: dict[str, CircuitBreaker] = {
+    name: CircuitBreaker(
+        name,
+        failure_threshold=settings.circuit_breaker_failure_threshold,
+        reset_seconds=settings.circuit_breaker_reset_seconds,
+    )
+    for name in ("amadeus", "opentripmap")
+}
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker | None:
+    provider = provider_for_url(url)
+    return circuit_breakers.get(provider) if provider else None
+
+
+def circuit_breaker_stats() -> dict[str, Any]:
+    return {name: breaker.stats() for name, breaker in circuit_breakers.items()}
@@ -19,9 +19,76 @@ class Settings(BaseSettings):
         "https://api.opentripmap.com/0.1/en",
         alias="OPENTRIPMAP_BASE_URL",
     )
+    poi_sync_ttl_seconds: int = Field(7 * 24 * 60 * 60, alias="POI_SYNC_TTL_SECONDS")
+    poi_sync_empty_ttl_seconds: int = Field(15 * 60, alias="POI_SYNC_EMPTY_TTL_SECONDS")
+    poi_sync_lock_timeout_seconds: int = Field(30, alias="POI_SYNC_LOCK_TIMEOUT_SECONDS")
+    poi_snapshot_max_cities: int = Field(64, alias="POI_SNAPSHOT_MAX_CITIES")
     http_trust_env: bool = Field(False, alias="HTTP_TRUST_ENV")
+    http_max_connections: int = Field(20, alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(
+        10, alias="HTTP_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    http_keepalive_expiry_seconds: float = Field(
+        30.0, alias="HTTP_KEEPALIVE_EXPIRY_SECONDS"
+    )
+    http_http2: bool = Field(False, alias="HTTP_HTTP2")
+    rate_limit_backend: str = Field("local", alias="RATE_LIMIT_BACKEND")
+    amadeus_rate_limit_per_second: float = Field(
+        10.0, alias="AMADEUS_RATE_LIMIT_PER_SECOND"
+    )
+    amadeus_rate_limit_burst: int = Field(10, alias="AMADEUS_RATE_LIMIT_BURST")
+    opentripmap_rate_limit_per_second: float = Field(
+        5.0, alias="OPENTRIPMAP_RATE_LIMIT_PER_SECOND"
+    )
+    opentripmap_rate_limit_burst: int = Field(5, alias="OPENTRIPMAP_RATE_LIMIT_BURST")
+    circuit_breaker_failure_threshold: int = Field(
+        5, alias="CIRCUIT_BREAKER_FAILURE_THRESHOLD"
+    )
+    circuit_breaker_reset_seconds: float = Field(30.0, alias="CIRCUIT_BREAKER_RESET_SECONDS")
+    http_retry_after_max_seconds: float = Field(10.0, alias="HTTP_RETRY_AFTER_MAX_SECONDS")
+    http_hedge_enabled: bool = Field(False, alias="HTTP_HEDGE_ENABLED")
+    http_hedge_percentile: float = Field(95.0, alias="HTTP_HEDGE_PERCENTILE")
+    http_hedge_min_samples: int = Field(20, alias="HTTP_HEDGE_MIN_SAMPLES")
+    http_hedge_max_ratio: float = Field(0.05, alias="HTTP_HEDGE_MAX_RATIO")
+    fx_base_currency: str = Field("USD", alias="FX_BASE_CURRENCY")
     result_cache_ttl_seconds: int = Field(600, alias="RESULT_CACHE_TTL_SECONDS")
+    partial_result_cache_ttl_seconds: int = Field(
+        60, alias="PARTIAL_RESULT_CACHE_TTL_SECONDS"
+    )
+    search_deadline_seconds: float = Field(25.0, alias="SEARCH_DEADLINE_SECONDS")
+    search_lock_timeout_seconds: int = Field(30, alias="SEARCH_LOCK_TIMEOUT_SECONDS")
+    search_job_workers: int = Field(4, alias="SEARCH_JOB_WORKERS")
+    search_job_queue_size: int = Field(100, alias="SEARCH_JOB_QUEUE_SIZE")
     city_candidates_limit: int = Field(5, alias="CITY_CANDIDATES_LIMIT")
+    global_city_candidates_limit: int = Field(10, alias="GLOBAL_CITY_CANDIDATES_LIMIT")
+    city_prerank_enabled: bool = Field(True, alias="CITY_PRERANK_ENABLED")
+    flight_destinations_ttl_seconds: int = Field(
+        6 * 60 * 60, alias="FLIGHT_DESTINATIONS_TTL_SECONDS"
+    )
+    flight_destinations_max_entries: int = Field(
+        256, alias="FLIGHT_DESTINATIONS_MAX_ENTRIES"
+    )
+    search_max_concurrency: int = Field(8, alias="SEARCH_MAX_CONCURRENCY")
+    search_provider_call_budget: int = Field(150, alias="SEARCH_PROVIDER_CALL_BUDGET")
+    prune_flight_budget_multiple: float = Field(
+        1.0, alias="PRUNE_FLIGHT_BUDGET_MULTIPLE"
+    )
+    ranking_weight_price: float = Field(0.5, alias="RANKING_WEIGHT_PRICE")
+    ranking_weight_stops: float = Field(0.15, alias="RANKING_WEIGHT_STOPS")
+    ranking_weight_duration: float = Field(0.15, alias="RANKING_WEIGHT_DURATION")
+    ranking_weight_rating: float = Field(0.1, alias="RANKING_WEIGHT_RATING")
+    ranking_weight_budget_slack: float = Field(0.1, alias="RANKING_WEIGHT_BUDGET_SLACK")
+    flight_offers_max: int = Field(5, alias="FLIGHT_OFFERS_MAX")
+    flight_cache_ttl_seconds: int = Field(900, alias="FLIGHT_CACHE_TTL_SECONDS")
+    flight_cache_max_entries: int = Field(2048, alias="FLIGHT_CACHE_MAX_ENTRIES")
+    hotel_reference_ttl_seconds: int = Field(
+        7 * 24 * 60 * 60, alias="HOTEL_REFERENCE_TTL_SECONDS"
+    )
+    hotel_reference_max_entries: int = Field(512, alias="HOTEL_REFERENCE_MAX_ENTRIES")
+    hotel_offer_cache_ttl_seconds: int = Field(600, alias="HOTEL_OFFER_CACHE_TTL_SECONDS")
+    hotel_offer_cache_max_entries: int = Field(
+        2048, alias="HOTEL_OFFER_CACHE_MAX_ENTRIES"
+    )
 
     model_config = SettingsConfigDict(
         env_file=str(ENV_FILE),
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, create_engine, text
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
@@ -13,6 +15,15 @@ engine = create_engine(
     future=True,
 )
 
+# A held GET_LOCK pins its connection for the whole search or POI sync. Those
+# connections are opened outside the main pool, so many concurrent locks cannot starve
+# request sessions; each costs one connect and disconnect instead.
+lock_engine = create_engine(
+    settings.database_url,
+    poolclass=NullPool,
+    future=True,
+)
+
 SessionLocal = sessionmaker(
     bind=engine,
     autocommit=False,
@@ -28,3 +39,68 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+class NamedLock:
+    """Cross-process advisory lock backed by MySQL ``GET_LOCK``.
+
+    The lock is bound to the connection that took it, so ``acquire`` and ``release``
+    must be paired on the same instance. That connection comes from ``lock_engine``,
+    not the session pool. Other dialects have no equivalent and the lock is a no-op
+    that always succeeds.
+    """
+
+    def __init__(self, name: str, timeout_seconds: float) -> None:
+        # MySQL caps lock names at 64 characters.
+        self.name = name[:64]
+        self._timeout_seconds = timeout_seconds
+        self._connection: Connection | None = None
+
+    def acquire(self) -> bool:
+        if lock_engine.dialect.name != "mysql":
+            return True
+        connection = lock_engine.connect()
+        try:
+            acquired = connection.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"),
+                {"name": self.name, "timeout": self._timeout_seconds},
+            ).scalar()
+        except Exception:
+            connection.close()
+            raise
+        if acquired != 1:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    async def acquire_async(self) -> bool:
+        """``acquire`` in a worker thread, safe to cancel while it waits.
+
+        The thread cannot be interrupted, so if the caller is cancelled first the lock
+        it goes on to take is released as soon as it has it.
+        """
+        attempt = asyncio.ensure_future(asyncio.to_thread(self.acquire))
+        try:
+            return await asyncio.shield(attempt)
+        except asyncio.CancelledError:
+            attempt.add_done_callback(self._release_abandoned)
+            raise
+
+    async def release_async(self) -> None:
+        await asyncio.to_thread(self.release)
+
+    def _release_abandoned(self, attempt: asyncio.Future[bool]) -> None:
+        if attempt.cancelled() or attempt.exception() is not None or not attempt.result():
+            return
+        asyncio.get_running_loop().run_in_executor(None, self.release)
+
+    def release(self) -> None:
+        connection = self._connection
+        if connection is None:
+            return
+        self._connection = None
+        try:
+            connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": self.name})
+        finally:
+            connection.close()
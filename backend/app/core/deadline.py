@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting provider work that cannot finish before the deadline."""
+
+
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """Give the work in this context ``seconds`` to finish; ``seconds <= 0`` adds none.
+
+    A nested scope never extends an outer deadline. Tasks and threads started inside
+    the block copy the context, so the deadline follows the work down to each call.
+    """
+    current = _deadline.get()
+    deadline = current
+    if seconds > 0:
+        proposed = time.monotonic() + seconds
+        deadline = proposed if current is None else min(current, proposed)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, or ``None`` without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+async def run_within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, cancelling it with ``asyncio.TimeoutError`` at the deadline."""
+    left = remaining()
+    if left is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout=max(left, 0.0))
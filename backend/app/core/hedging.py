@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from app.core.config import settings
+from app.core.providers import provider_for_url
+from app.core.rate_limit import RateLimiter
+
+
+class Hedger:
+    """Send a duplicate of a slow request and keep whichever answer arrives first.
+
+    The hedge fires once the primary has been outstanding longer than the configured
+    percentile of recent latencies for the provider. Hedges are capped at
+    ``max_ratio`` of all requests, so they never add more than that share of load.
+    Only the wire request is timed: the caller takes the primary's rate-limit token
+    before ``run``, and the hedge takes its own when it fires. No hedge fires while
+    other requests are queued for a token, since it would only queue behind them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        enabled: bool,
+        percentile: float,
+        min_samples: int,
+        max_ratio: float,
+        window: int = 200,
+    ) -> None:
+        self.name = name
+        self._enabled = enabled
+        self._percentile = min(max(percentile, 0.0), 100.0)
+        self._min_samples = max(min_samples, 1)
+        self._max_ratio = max_ratio
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled and self._max_ratio > 0
+
+    def threshold(self) -> float | None:
+        """Seconds after which a request is hedged, or ``None`` without enough samples."""
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * self._percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _try_spend(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.requests * self._max_ratio:
+                return False
+            self.hedged += 1
+            return True
+
+    async def run(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        *,
+        limiter: RateLimiter | None = None,
+    ) -> httpx.Response:
+        with self._lock:
+            self.requests += 1
+        delay = self.threshold() if self.enabled else None
+        started = time.monotonic()
+        primary = asyncio.ensure_future(send())
+        tasks = {primary}
+
+        async def hedge() -> httpx.Response:
+            if limiter is not None:
+                await limiter.acquire_async()
+            return await send()
+
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                throttled = limiter is not None and limiter.waiting > 0
+                if not done and not throttled and self._try_spend():
+                    tasks.add(asyncio.ensure_future(hedge()))
+            winner = await _first_success(tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if winner is not primary:
+            self.hedge_wins += 1
+        response = winner.result()
+        self.observe(time.monotonic() - started)
+        return response
+
+    def stats(self) -> dict[str, Any]:
+        threshold = self.threshold()
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "threshold_ms": round(threshold * 1000, 1) if threshold is not None else None,
+        }
+
+
+async def _first_success(
+    tasks: set[asyncio.Future[httpx.Response]],
+) -> asyncio.Future[httpx.Response]:
+    """Return the first task to succeed, or the last one to fail if none does."""
+    pending = set(tasks)
+    while True:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                return task
+        if not pending:
+            return done.pop()
+
+
+hedgers: dict[str, Hedger] = {
+    name: Hedger(
+        name,
+        enabled=settings.http_hedge_enabled,
+        percentile=settings.http_hedge_percentile,
+        min_samples=settings.http_hedge_min_samples,
+        max_ratio=settings.http_hedge_max_ratio,
+    )
+    for name in ("amadeus", "opentripmap")
+}
+
+
+def get_hedger(url: str) -> Hedger | None:
+    provider = provider_for_url(url)
+    return hedgers.get(provider) if provider else None
+
+
+def hedging_stats() -> dict[str, Any]:
+    return {name: hedger.stats() for name, hedger in hedgers.items()}
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import httpx
+
+from app.core.config import settings
+
+
+def provider_for_url(url: str) -> str | None:
+    """Name the external provider serving ``url``; rate limits and breakers key on it."""
+    host = httpx.URL(url).host
+    if host == "amadeus.com" or host.endswith(".amadeus.com"):
+        return "amadeus"
+    if host == httpx.URL(settings.opentripmap_base_url).host:
+        return "opentripmap"
+    return None
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Protocol
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.providers import provider_for_url
+from app.models.rate_limit import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+
+class BucketStore(Protocol):
+    # True when ``reserve`` does I/O and must be kept off the event loop.
+    blocking: bool
+
+    def reserve(self, name: str, rate: float, burst: int) -> float:
+        """Take one token from ``name`` and return how long to wait before using it."""
+        ...
+
+
+def _take_token(
+    tokens: float,
+    refilled_at: float,
+    now: float,
+    rate: float,
+    burst: int,
+) -> tuple[float, float]:
+    # Tokens may go negative: each caller reserves its slot up front, so waiters are
+    # served in arrival order without polling.
+    tokens = min(float(burst), tokens + max(now - refilled_at, 0.0) * rate) - 1
+    return tokens, max(-tokens / rate, 0.0)
+
+
+class LocalBucketStore:
+    """Buckets in process memory; each worker process gets its own full rate."""
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, name: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, refilled_at = self._buckets.get(name, (float(burst), now))
+            tokens, wait = _take_token(tokens, refilled_at, now, rate, burst)
+            self._buckets[name] = (tokens, now)
+        return wait
+
+
+class DbBucketStore:
+    """Buckets in the ``rate_limit_bucket`` table, shared by every worker process.
+
+    The row is locked with ``SELECT ... FOR UPDATE`` for the read-modify-write. If the
+    database is unavailable the local store takes over so provider calls still go out.
+    """
+
+    blocking = True
+
+    def __init__(self, fallback: LocalBucketStore) -> None:
+        self._fallback = fallback
+
+    def reserve(self, name: str, rate: float, burst: int) -> float:
+        try:
+            return self._reserve(name, rate, burst)
+        except IntegrityError:
+            # Another process created the bucket row first; retry against it.
+            return self._reserve(name, rate, burst)
+        except SQLAlchemyError:
+            logger.warning("rate_limit_bucket update failed for %s", name, exc_info=True)
+            return self._fallback.reserve(name, rate, burst)
+
+    def _reserve(self, name: str, rate: float, burst: int) -> float:
+        now = time.time()
+        with SessionLocal() as db:
+            row = db.execute(
+                select(RateLimitBucket)
+                .where(RateLimitBucket.name == name)
+                .with_for_update()
+            ).scalar_one_or_none()
+            if row is None:
+                row = RateLimitBucket(name=name, tokens=float(burst), refilled_at=now)
+                db.add(row)
+            tokens, wait = _take_token(row.tokens, row.refilled_at, now, rate, burst)
+            row.tokens = tokens
+            row.refilled_at = max(now, row.refilled_at)
+            db.commit()
+        return wait
+
+
+class RateLimiter:
+    """Token bucket for one provider; callers wait for a token instead of a 429."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        rate_per_second: float,
+        burst: int,
+        store: BucketStore,
+    ) -> None:
+        self.name = name
+        self._rate = rate_per_second
+        self._burst = max(burst, 1)
+        self._store = store
+        self.acquired = 0
+        self.delayed = 0
+        self.waiting = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._rate > 0
+
+    def acquire(self) -> float:
+        if not self.enabled:
+            return 0.0
+        self.waiting += 1
+        try:
+            wait = self._store.reserve(self.name, self._rate, self._burst)
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            self.waiting -= 1
+        self._record(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        if not self.enabled:
+            return 0.0
+        self.waiting += 1
+        try:
+            if self._store.blocking:
+                wait = await asyncio.to_thread(
+                    self._store.reserve, self.name, self._rate, self._burst
+                )
+            else:
+                wait = self._store.reserve(self.name, self._rate, self._burst)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+        self._record(wait)
+        return wait
+
+    def _record(self, wait: float) -> None:
+        self.acquired += 1
+        if wait > 0:
+            self.delayed += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rate_per_second": self._rate,
+            "burst": self._burst,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "waiting": self.waiting,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "wait_seconds_max": round(self.wait_seconds_max, 3),
+        }
+
+
+def _build_store() -> BucketStore:
+    local = LocalBucketStore()
+    if settings.rate_limit_backend.lower() == "db":
+        return DbBucketStore(local)
+    return local
+
+
+_store = _build_store()
+rate_limiters: dict[str, RateLimiter] = {
+    "amadeus": RateLimiter(
+        "amadeus",
+        rate_per_second=settings.amadeus_rate_limit_per_second,
+        burst=settings.amadeus_rate_limit_burst,
+        store=_store,
+    ),
+    "opentripmap": RateLimiter(
+        "opentripmap",
+        rate_per_second=settings.opentripmap_rate_limit_per_second,
+        burst=settings.opentripmap_rate_limit_burst,
+        store=_store,
+    ),
+}
+
+
+def get_rate_limiter(url: str) -> RateLimiter | None:
+    """Return the limiter for the provider serving ``url``, if it has one."""
+    provider = provider_for_url(url)
+    return rate_limiters.get(provider) if provider else None
+
+
+def rate_limit_stats() -> dict[str, Any]:
+    return {
+        "backend": settings.rate_limit_backend.lower(),
+        "providers": {name: limiter.stats() for name, limiter in rate_limiters.items()},
+    }
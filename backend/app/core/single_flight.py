@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+from app.core.call_budget import ProviderCallBudgetExceeded
+from app.core.deadline import DeadlineExceeded
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Failures that come from the leader's own request context rather than from the call;
+# a follower with budget and time left takes the call over instead of inheriting them.
+_LEADER_ERRORS: tuple[type[BaseException], ...] = (
+    ProviderCallBudgetExceeded,
+    DeadlineExceeded,
+)
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesce concurrent calls per key: the first caller runs, the rest await its result."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[K, asyncio.Future[V]] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._inflight
+
+    async def run(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leader was cancelled (e.g. its caller hit a deadline), not us:
+                # take over the call instead of failing with its cancellation.
+                return await self.run(key, fn)
+            except _LEADER_ERRORS:
+                return await self.run(key, fn)
+
+        future: asyncio.Future[V] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Followers re-raise the leader's error; don't warn when nobody waited.
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import threading
 import time
 from dataclasses import dataclass
@@ -9,7 +10,11 @@ import httpx
 from app.core.config import settings
 from functools import lru_cache
 
-from app.integrations.http_utils import DEFAULT_TIMEOUT, request_with_retry
+from app.integrations.http_utils import (
+    DEFAULT_TIMEOUT,
+    request_with_retry,
+    request_with_retry_async,
+)
 
 
 @dataclass(frozen=True)
@@ -39,6 +44,7 @@ class AmadeusAuthClient:
         self._backoff_base = backoff_base
         self._token: AmadeusToken | None = None
         self._lock = threading.Lock()
+        self._async_lock: asyncio.Lock | None = None
 
     @property
     def base_url(self) -> str:
@@ -61,36 +67,72 @@ class AmadeusAuthClient:
             self._token = token
             return token.access_token
 
+    async def get_access_token_async(self) -> str:
+        token = self._token
+        if token and time.time() < token.expires_at - 30:
+            return token.access_token
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            token = self._token
+            if token and time.time() < token.expires_at - 30:
+                return token.access_token
+            token = await self._fetch_token_async()
+            self._token = token
+            return token.access_token
+
     def _fetch_token(self) -> AmadeusToken:
-        url = f"{self.base_url}/v1/security/oauth2/token"
-        data = {
-            "grant_type": "client_credentials",
-            "client_id": self._api_key,
-            "client_secret": self._api_secret,
-        }
         response = request_with_retry(
             "POST",
-            url,
-            data=data,
+            self._token_url,
+            data=self._token_form(),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=self._timeout,
+            max_retries=self._max_retries,
+            backoff_base=self._backoff_base,
+        )
+        return _parse_token_response(response)
+
+    async def _fetch_token_async(self) -> AmadeusToken:
+        response = await request_with_retry_async(
+            "POST",
+            self._token_url,
+            data=self._token_form(),
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             timeout=self._timeout,
             max_retries=self._max_retries,
             backoff_base=self._backoff_base,
         )
-        response.raise_for_status()
-        payload = response.json()
-
-        access_token = payload.get("access_token")
-        expires_in = payload.get("expires_in", 0)
-        if not access_token:
-            raise RuntimeError("Amadeus token response missing access_token.")
-        try:
-            expires_in_value = float(expires_in)
-        except (TypeError, ValueError) as exc:
-            raise RuntimeError("Amadeus token response has invalid expires_in.") from exc
-
-        expires_at = time.time() + max(expires_in_value, 0)
-        return AmadeusToken(access_token=access_token, expires_at=expires_at)
+        return _parse_token_response(response)
+
+    @property
+    def _token_url(self) -> str:
+        return f"{self.base_url}/v1/security/oauth2/token"
+
+    def _token_form(self) -> dict[str, str]:
+        return {
+            "grant_type": "client_credentials",
+            "client_id": self._api_key,
+            "client_secret": self._api_secret,
+        }
+
+
+def _parse_token_response(response: httpx.Response) -> AmadeusToken:
+    response.raise_for_status()
+    payload = response.json()
+
+    access_token = payload.get("access_token")
+    expires_in = payload.get("expires_in", 0)
+    if not access_token:
+        raise RuntimeError("Amadeus token response missing access_token.")
+    try:
+        expires_in_value = float(expires_in)
+    except (TypeError, ValueError) as exc:
+        raise RuntimeError("Amadeus token response has invalid expires_in.") from exc
+
+    expires_at = time.time() + max(expires_in_value, 0)
+    return AmadeusToken(access_token=access_token, expires_at=expires_at)
 
 
 @lru_cache
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import date
 from typing import Any
 
@@ -9,10 +10,32 @@ from functools import lru_cache
 
 from app.core.config import settings
 from app.integrations.amadeus_auth import AmadeusAuthClient, get_auth_client
-from app.integrations.http_utils import DEFAULT_TIMEOUT, request_with_retry
+from app.integrations.http_utils import (
+    DEFAULT_TIMEOUT,
+    request_with_retry_async,
+)
+from app.integrations.offers import (
+    FlightEndpoint,
+    FlightItinerary,
+    FlightOfferSummary,
+    FlightSegment,
+)
 
 
-class AmadeusFlightsClient:
+@dataclass(frozen=True)
+class RawFlightOffers:
+    """Unsummarized flight-offers payload.
+
+    ``max_price`` is the per-traveler cap pushed down as ``maxPrice`` when fetching;
+    ``None`` means the offers were fetched without a cap.
+    """
+
+    offers: list[dict[str, Any]]
+    carriers: dict[str, str]
+    max_price: int | None = None
+
+
+class AsyncAmadeusFlightsClient:
     def __init__(
         self,
         auth_client: AmadeusAuthClient,
@@ -36,7 +59,48 @@ class AmadeusFlightsClient:
             else "https://test.api.amadeus.com"
         )
 
-    def search_offers(
+    @property
+    def _offers_url(self) -> str:
+        return f"{self.base_url}/v2/shopping/flight-offers"
+
+    @property
+    def _destinations_url(self) -> str:
+        return f"{self.base_url}/v1/shopping/flight-destinations"
+
+    async def search_raw_offers(
+        self,
+        *,
+        origin: str,
+        destination: str,
+        date_from: date,
+        date_to: date | None,
+        adults: int,
+        currency_code: str | None = None,
+        non_stop: bool = False,
+        max_price: int | None = None,
+    ) -> RawFlightOffers:
+        token = await self._auth_client.get_access_token_async()
+        response = await request_with_retry_async(
+            "GET",
+            self._offers_url,
+            params=_build_search_params(
+                origin=origin,
+                destination=destination,
+                date_from=date_from,
+                date_to=date_to,
+                adults=adults,
+                currency_code=currency_code,
+                non_stop=non_stop,
+                max_price=max_price,
+            ),
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=self._timeout,
+            max_retries=self._max_retries,
+            backoff_base=self._backoff_base,
+        )
+        return _parse_offers_response(response, max_price=max_price)
+
+    async def search_offers(
         self,
         *,
         origin: str,
@@ -46,45 +110,149 @@ class AmadeusFlightsClient:
         adults: int,
         max_stops: int | None,
         currency_code: str | None = None,
-    ) -> list[dict[str, Any]]:
-        token = self._auth_client.get_access_token()
-        params: dict[str, Any] = {
-            "originLocationCode": origin,
-            "destinationLocationCode": destination,
-            "departureDate": date_from.isoformat(),
-            "adults": adults,
-            "max": 10,
-        }
-        if date_to:
-            params["returnDate"] = date_to.isoformat()
-        if currency_code:
-            params["currencyCode"] = currency_code
-
-        response = request_with_retry(
+    ) -> list[FlightOfferSummary]:
+        raw = await self.search_raw_offers(
+            origin=origin,
+            destination=destination,
+            date_from=date_from,
+            date_to=date_to,
+            adults=adults,
+            currency_code=currency_code,
+            non_stop=max_stops == 0,
+        )
+        return select_offers(raw, max_stops=max_stops)
+
+    async def cheapest_destinations(
+        self,
+        *,
+        origin: str,
+        departure_from: date,
+        departure_to: date,
+    ) -> dict[str, float]:
+        token = await self._auth_client.get_access_token_async()
+        response = await request_with_retry_async(
             "GET",
-            f"{self.base_url}/v2/shopping/flight-offers",
-            params=params,
+            self._destinations_url,
+            params=_build_destinations_params(
+                origin=origin,
+                departure_from=departure_from,
+                departure_to=departure_to,
+            ),
             headers={"Authorization": f"Bearer {token}"},
             timeout=self._timeout,
             max_retries=self._max_retries,
             backoff_base=self._backoff_base,
         )
-        response.raise_for_status()
-        payload = response.json()
-        offers = payload.get("data", [])
-        if not isinstance(offers, list):
-            offers = []
-        dictionaries = payload.get("dictionaries", {}) or {}
-        carriers = dictionaries.get("carriers", {}) if isinstance(dictionaries, dict) else {}
-
-        summarized: list[dict[str, Any]] = []
-        for offer in offers:
-            if max_stops is not None and _max_stops_for_offer(offer) > max_stops:
+        return _parse_destinations_response(response)
+
+
+def _build_search_params(
+    *,
+    origin: str,
+    destination: str,
+    date_from: date,
+    date_to: date | None,
+    adults: int,
+    currency_code: str | None,
+    non_stop: bool,
+    max_price: int | None,
+) -> dict[str, Any]:
+    params: dict[str, Any] = {
+        "originLocationCode": origin,
+        "destinationLocationCode": destination,
+        "departureDate": date_from.isoformat(),
+        "adults": adults,
+        "max": max(settings.flight_offers_max, 1),
+    }
+    if date_to:
+        params["returnDate"] = date_to.isoformat()
+    if currency_code:
+        params["currencyCode"] = currency_code
+    if non_stop:
+        params["nonStop"] = "true"
+    if max_price is not None:
+        params["maxPrice"] = max_price
+    return params
+
+
+def _parse_offers_response(
+    response: httpx.Response,
+    *,
+    max_price: int | None,
+) -> RawFlightOffers:
+    response.raise_for_status()
+    payload = response.json()
+    offers = payload.get("data", [])
+    if not isinstance(offers, list):
+        offers = []
+    dictionaries = payload.get("dictionaries", {}) or {}
+    carriers = dictionaries.get("carriers", {}) if isinstance(dictionaries, dict) else {}
+    return RawFlightOffers(offers=offers, carriers=carriers or {}, max_price=max_price)
+
+
+def _build_destinations_params(
+    *,
+    origin: str,
+    departure_from: date,
+    departure_to: date,
+) -> dict[str, Any]:
+    return {
+        "origin": origin,
+        "departureDate": f"{departure_from.isoformat()},{departure_to.isoformat()}",
+        "viewBy": "DESTINATION",
+    }
+
+
+def _parse_destinations_response(response: httpx.Response) -> dict[str, float]:
+    """Map destination code to the cheapest cached round-trip price Amadeus knows of.
+
+    Prices are in the origin's market currency and only meant for ranking.
+    """
+    response.raise_for_status()
+    data = response.json().get("data", [])
+    if not isinstance(data, list):
+        return {}
+    prices: dict[str, float] = {}
+    for item in data:
+        destination = item.get("destination")
+        total = _offer_price_total(item)
+        if not destination or total is None:
+            continue
+        if destination not in prices or total < prices[destination]:
+            prices[destination] = total
+    return prices
+
+
+def select_offers(
+    raw: RawFlightOffers,
+    *,
+    max_stops: int | None,
+    max_price: int | None = None,
+    adults: int = 1,
+    limit: int = 3,
+) -> list[FlightOfferSummary]:
+    """Filter raw offers by stops and per-traveler price, summarizing only those kept."""
+    selected: list[FlightOfferSummary] = []
+    for offer in raw.offers:
+        if max_stops is not None and _max_stops_for_offer(offer) > max_stops:
+            continue
+        if max_price is not None:
+            total = _offer_price_total(offer)
+            if total is not None and total > max_price * adults:
                 continue
-            summarized.append(summarize_offer(offer, carriers=carriers))
-            if len(summarized) >= 3:
-                break
-        return summarized
+        selected.append(summarize_offer(offer, carriers=raw.carriers))
+        if len(selected) >= limit:
+            break
+    return selected
+
+
+def _offer_price_total(offer: dict[str, Any]) -> float | None:
+    price = offer.get("price", {}) or {}
+    value = price.get("grandTotal") or price.get("total")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
 def _max_stops_for_offer(offer: dict[str, Any]) -> int:
@@ -101,58 +269,52 @@ def summarize_offer(
     offer: dict[str, Any],
     *,
     carriers: dict[str, str] | None = None,
-) -> dict[str, Any]:
+) -> FlightOfferSummary:
     price = offer.get("price", {}) or {}
-    itineraries_summary = []
+    itineraries: list[FlightItinerary] = []
     for itinerary in offer.get("itineraries", []) or []:
-        segments_summary = []
+        segments: list[FlightSegment] = []
         for segment in itinerary.get("segments", []) or []:
             departure = segment.get("departure", {}) or {}
             arrival = segment.get("arrival", {}) or {}
             carrier_code = segment.get("carrierCode")
-            segments_summary.append(
-                {
-                    "departure": {
-                        "iata_code": departure.get("iataCode"),
-                        "at": departure.get("at"),
-                    },
-                    "arrival": {
-                        "iata_code": arrival.get("iataCode"),
-                        "at": arrival.get("at"),
-                    },
-                    "carrier_code": carrier_code,
-                    "carrier_name": (carriers or {}).get(carrier_code),
-                    "flight_number": segment.get("number"),
-                    "duration": segment.get("duration"),
-                }
+            segments.append(
+                FlightSegment(
+                    departure=FlightEndpoint(
+                        iata_code=departure.get("iataCode"),
+                        at=departure.get("at"),
+                    ),
+                    arrival=FlightEndpoint(
+                        iata_code=arrival.get("iataCode"),
+                        at=arrival.get("at"),
+                    ),
+                    carrier_code=carrier_code,
+                    carrier_name=(carriers or {}).get(carrier_code),
+                    flight_number=segment.get("number"),
+                    duration=segment.get("duration"),
+                )
             )
-        itineraries_summary.append(
-            {
-                "duration": itinerary.get("duration"),
-                "segments": segments_summary,
-            }
+        itineraries.append(
+            FlightItinerary(duration=itinerary.get("duration"), segments=tuple(segments))
         )
 
-    return {
-        "id": offer.get("id"),
-        "name": _build_offer_name(itineraries_summary),
-        "currency": price.get("currency"),
-        "price_total": price.get("grandTotal") or price.get("total"),
-        "max_stops": _max_stops_for_offer(offer),
-        "itineraries": itineraries_summary,
-    }
+    return FlightOfferSummary(
+        id=offer.get("id"),
+        name=_build_offer_name(itineraries),
+        currency=price.get("currency"),
+        price_total=_offer_price_total(offer),
+        max_stops=_max_stops_for_offer(offer),
+        itineraries=tuple(itineraries),
+    )
 
 
-def _build_offer_name(itineraries: list[dict[str, Any]]) -> str | None:
-    if not itineraries:
-        return None
-    segments = itineraries[0].get("segments", []) or []
-    if not segments:
+def _build_offer_name(itineraries: list[FlightItinerary]) -> str | None:
+    if not itineraries or not itineraries[0].segments:
         return None
-    first_segment = segments[0]
-    carrier_name = first_segment.get("carrier_name")
-    carrier_code = first_segment.get("carrier_code")
-    flight_number = first_segment.get("flight_number")
+    first_segment = itineraries[0].segments[0]
+    carrier_name = first_segment.carrier_name
+    carrier_code = first_segment.carrier_code
+    flight_number = first_segment.flight_number
     if carrier_name and flight_number:
         return f"{carrier_name} {flight_number}"
     if carrier_code and flight_number:
@@ -161,6 +323,6 @@ def _build_offer_name(itineraries: list[dict[str, Any]]) -> str | None:
 
 
 @lru_cache
-def get_flights_client() -> AmadeusFlightsClient:
+def get_async_flights_client() -> AsyncAmadeusFlightsClient:
     auth_client = get_auth_client()
-    return AmadeusFlightsClient(auth_client, env=settings.amadeus_env)
+    return AsyncAmadeusFlightsClient(auth_client, env=settings.amadeus_env)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from datetime import date
 from functools import lru_cache
 from typing import Any
@@ -9,23 +8,14 @@ import httpx
 
 from app.core.config import settings
 from app.integrations.amadeus_auth import AmadeusAuthClient, get_auth_client
-from app.integrations.http_utils import DEFAULT_TIMEOUT, request_with_retry
+from app.integrations.http_utils import (
+    DEFAULT_TIMEOUT,
+    request_with_retry_async,
+)
+from app.integrations.offers import HotelOfferSummary
 
 
-@dataclass(frozen=True)
-class HotelOfferSummary:
-    id: str | None
-    name: str | None
-    city_code: str | None
-    currency: str | None
-    price_total: float | None
-    price_per_night_estimate: float | None
-    rating: str | None
-    address: dict[str, Any] | None
-    cancellation_policy: Any | None
-
-
-class AmadeusHotelsClient:
+class AsyncAmadeusHotelsClient:
     def __init__(
         self,
         auth_client: AmadeusAuthClient,
@@ -49,38 +39,34 @@ class AmadeusHotelsClient:
             else "https://test.api.amadeus.com"
         )
 
-    def list_hotels_by_city(
+    @property
+    def _by_city_url(self) -> str:
+        return f"{self.base_url}/v1/reference-data/locations/hotels/by-city"
+
+    @property
+    def _offers_url(self) -> str:
+        return f"{self.base_url}/v3/shopping/hotel-offers"
+
+    async def list_hotels_by_city(
         self,
         *,
         city_code: str,
         stars_min: int | None = None,
         limit: int = 10,
     ) -> list[dict[str, Any]]:
-        token = self._auth_client.get_access_token()
-        params: dict[str, Any] = {"cityCode": city_code}
-        if stars_min is not None:
-            ratings = [str(value) for value in range(stars_min, 6)]
-            if len(ratings) > 4:
-                ratings = ratings[:4]
-            params["ratings"] = ",".join(ratings)
-
-        response = request_with_retry(
+        token = await self._auth_client.get_access_token_async()
+        response = await request_with_retry_async(
             "GET",
-            f"{self.base_url}/v1/reference-data/locations/hotels/by-city",
-            params=params,
+            self._by_city_url,
+            params=_build_by_city_params(city_code=city_code, stars_min=stars_min),
             headers={"Authorization": f"Bearer {token}"},
             timeout=self._timeout,
             max_retries=self._max_retries,
             backoff_base=self._backoff_base,
         )
-        response.raise_for_status()
-        payload = response.json()
-        hotels = payload.get("data", [])
-        if not isinstance(hotels, list):
-            return []
-        return hotels[:limit]
+        return _parse_hotel_list(response, limit=limit)
 
-    def search_offers(
+    async def search_offers(
         self,
         *,
         city_code: str,
@@ -91,102 +77,182 @@ class AmadeusHotelsClient:
         stars_min: int | None = None,
         currency_code: str | None = None,
     ) -> list[HotelOfferSummary]:
-        hotels = self.list_hotels_by_city(
+        hotels = await self.list_hotels_by_city(
             city_code=city_code,
             stars_min=stars_min,
         )
-        if not hotels:
-            return []
+        return await self.search_offers_for_hotels(
+            hotels,
+            city_code=city_code,
+            check_in=check_in,
+            check_out=check_out,
+            adults=adults,
+            max_price=max_price,
+            currency_code=currency_code,
+        )
 
-        hotel_ids = [hotel.get("hotelId") for hotel in hotels if hotel.get("hotelId")]
+    async def search_offers_for_hotels(
+        self,
+        hotels: list[dict[str, Any]],
+        *,
+        city_code: str,
+        check_in: date,
+        check_out: date,
+        adults: int,
+        max_price: float | None = None,
+        currency_code: str | None = None,
+    ) -> list[HotelOfferSummary]:
+        hotel_ids = _hotel_ids(hotels)
         if not hotel_ids:
             return []
 
-        token = self._auth_client.get_access_token()
-        params = {
-            "hotelIds": ",".join(hotel_ids[:10]),
-            "adults": adults,
-            "checkInDate": check_in.isoformat(),
-            "checkOutDate": check_out.isoformat(),
-            "roomQuantity": 1,
-        }
-        if currency_code:
-            params["currency"] = currency_code
-
-        response = request_with_retry(
+        token = await self._auth_client.get_access_token_async()
+        params = _build_offers_params(
+            hotel_ids=hotel_ids,
+            check_in=check_in,
+            check_out=check_out,
+            adults=adults,
+            currency_code=currency_code,
+        )
+        response = await request_with_retry_async(
             "GET",
-            f"{self.base_url}/v3/shopping/hotel-offers",
+            self._offers_url,
             params=params,
             headers={"Authorization": f"Bearer {token}"},
             timeout=self._timeout,
             max_retries=self._max_retries,
             backoff_base=self._backoff_base,
         )
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            if exc.response.status_code == 400 and currency_code:
-                params.pop("currency", None)
-                response = request_with_retry(
-                    "GET",
-                    f"{self.base_url}/v3/shopping/hotel-offers",
-                    params=params,
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=self._timeout,
-                    max_retries=self._max_retries,
-                    backoff_base=self._backoff_base,
-                )
-                response.raise_for_status()
-            else:
-                raise
-        payload = response.json()
-        data = payload.get("data", [])
-        if not isinstance(data, list):
-            return []
+        if _should_retry_without_currency(response, currency_code):
+            params.pop("currency", None)
+            response = await request_with_retry_async(
+                "GET",
+                self._offers_url,
+                params=params,
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self._timeout,
+                max_retries=self._max_retries,
+                backoff_base=self._backoff_base,
+            )
+        return _parse_offers_response(
+            response,
+            hotels=hotels,
+            city_code=city_code,
+            check_in=check_in,
+            check_out=check_out,
+            max_price=max_price,
+        )
+
+
+def _build_by_city_params(*, city_code: str, stars_min: int | None) -> dict[str, Any]:
+    params: dict[str, Any] = {"cityCode": city_code}
+    if stars_min is not None:
+        ratings = [str(value) for value in range(stars_min, 6)]
+        if len(ratings) > 4:
+            ratings = ratings[:4]
+        params["ratings"] = ",".join(ratings)
+    return params
+
+
+def _parse_hotel_list(response: httpx.Response, *, limit: int) -> list[dict[str, Any]]:
+    response.raise_for_status()
+    payload = response.json()
+    hotels = payload.get("data", [])
+    if not isinstance(hotels, list):
+        return []
+    return hotels[:limit]
+
+
+def _hotel_ids(hotels: list[dict[str, Any]]) -> list[str]:
+    return [hotel.get("hotelId") for hotel in hotels if hotel.get("hotelId")]
+
+
+def _build_offers_params(
+    *,
+    hotel_ids: list[str],
+    check_in: date,
+    check_out: date,
+    adults: int,
+    currency_code: str | None,
+) -> dict[str, Any]:
+    params: dict[str, Any] = {
+        "hotelIds": ",".join(hotel_ids[:10]),
+        "adults": adults,
+        "checkInDate": check_in.isoformat(),
+        "checkOutDate": check_out.isoformat(),
+        "roomQuantity": 1,
+    }
+    if currency_code:
+        params["currency"] = currency_code
+    return params
+
+
+def _should_retry_without_currency(
+    response: httpx.Response,
+    currency_code: str | None,
+) -> bool:
+    # Some properties reject the requested currency; retry once in the hotel's own.
+    return response.status_code == 400 and bool(currency_code)
+
+
+def _parse_offers_response(
+    response: httpx.Response,
+    *,
+    hotels: list[dict[str, Any]],
+    city_code: str,
+    check_in: date,
+    check_out: date,
+    max_price: float | None,
+) -> list[HotelOfferSummary]:
+    response.raise_for_status()
+    payload = response.json()
+    data = payload.get("data", [])
+    if not isinstance(data, list):
+        return []
+
+    hotel_lookup = {
+        hotel.get("hotelId"): hotel for hotel in hotels if hotel.get("hotelId")
+    }
+    all_offers: list[HotelOfferSummary] = []
+    nights = max((check_out - check_in).days, 0)
+
+    for item in data:
+        hotel = item.get("hotel", {}) or {}
+        offers = item.get("offers", []) or []
+        hotel_id = hotel.get("hotelId")
+        base_hotel = hotel_lookup.get(hotel_id, {})
+        name = hotel.get("name") or base_hotel.get("name")
+        address = base_hotel.get("address") or hotel.get("address")
+        rating = hotel.get("rating") or base_hotel.get("rating")
+        city = hotel.get("cityCode") or base_hotel.get("iataCode") or city_code
+
+        for offer in offers:
+            price_total = _parse_price_total(offer)
+            if max_price is not None and price_total is not None:
+                if price_total > max_price:
+                    continue
+            currency = _get_currency(offer)
+            price_per_night = (
+                round(price_total / nights, 2)
+                if price_total is not None and nights > 0
+                else None
+            )
+            cancellation_policy = _get_cancellation_policy(offer)
+            summary = HotelOfferSummary(
+                id=offer.get("id"),
+                name=name,
+                city_code=city,
+                currency=currency,
+                price_total=price_total,
+                price_per_night_estimate=price_per_night,
+                rating=rating,
+                address=address,
+                cancellation_policy=cancellation_policy,
+            )
+            all_offers.append(summary)
 
-        hotel_lookup = {
-            hotel.get("hotelId"): hotel for hotel in hotels if hotel.get("hotelId")
-        }
-        all_offers: list[HotelOfferSummary] = []
-        nights = max((check_out - check_in).days, 0)
-
-        for item in data:
-            hotel = item.get("hotel", {}) or {}
-            offers = item.get("offers", []) or []
-            hotel_id = hotel.get("hotelId")
-            base_hotel = hotel_lookup.get(hotel_id, {})
-            name = hotel.get("name") or base_hotel.get("name")
-            address = base_hotel.get("address") or hotel.get("address")
-            rating = hotel.get("rating") or base_hotel.get("rating")
-            city = hotel.get("cityCode") or base_hotel.get("iataCode") or city_code
-
-            for offer in offers:
-                price_total = _parse_price_total(offer)
-                if max_price is not None and price_total is not None:
-                    if price_total > max_price:
-                        continue
-                currency = _get_currency(offer)
-                price_per_night = (
-                    round(price_total / nights, 2)
-                    if price_total is not None and nights > 0
-                    else None
-                )
-                cancellation_policy = _get_cancellation_policy(offer)
-                summary = HotelOfferSummary(
-                    id=offer.get("id"),
-                    name=name,
-                    city_code=city,
-                    currency=currency,
-                    price_total=price_total,
-                    price_per_night_estimate=price_per_night,
-                    rating=rating,
-                    address=address,
-                    cancellation_policy=cancellation_policy,
-                )
-                all_offers.append(summary)
-
-        all_offers.sort(key=_offer_sort_key)
-        return all_offers[:3]
+    all_offers.sort(key=_offer_sort_key)
+    return all_offers[:3]
 
 
 def _parse_price_total(offer: dict[str, Any]) -> float | None:
@@ -222,6 +288,6 @@ def _offer_sort_key(summary: HotelOfferSummary) -> tuple[float, str]:
 
 
 @lru_cache
-def get_hotels_client() -> AmadeusHotelsClient:
+def get_async_hotels_client() -> AsyncAmadeusHotelsClient:
     auth_client = get_auth_client()
-    return AmadeusHotelsClient(auth_client, env=settings.amadeus_env)
+    return AsyncAmadeusHotelsClient(auth_client, env=settings.amadeus_env)
@@ -1,24 +1,57 @@
 from __future__ import annotations
 
-import threading
 import time
 from dataclasses import dataclass
-from typing import Any
 
 import httpx
 
-from app.integrations.http_utils import DEFAULT_TIMEOUT, request_with_retry
+from app.integrations.http_utils import DEFAULT_TIMEOUT, request_with_retry_async
 
 
 OPEN_ER_API_BASE_URL = "https://open.er-api.com/v6/latest"
 DEFAULT_FX_CACHE_TTL_SECONDS = 12 * 60 * 60
 
 
-@dataclass
-class FxCacheEntry:
+@dataclass(frozen=True)
+class FxSnapshot:
+    """Rates quoted against one base currency; every cross rate is derived from it.
+
+    ``rates`` maps a currency code to units of that currency per one unit of ``base``.
+    Timestamps are unix seconds.
+    """
+
+    base: str
     rates: dict[str, float]
+    fetched_at: float
     expires_at: float
 
+    def rate(self, from_currency: str, to_currency: str) -> float | None:
+        source = from_currency.upper()
+        target = to_currency.upper()
+        if source == target:
+            return 1.0
+        source_rate = self._per_base(source)
+        target_rate = self._per_base(target)
+        if not source_rate or target_rate is None:
+            return None
+        return target_rate / source_rate
+
+    def factors_to(self, to_currency: str) -> dict[str, float]:
+        """Multiplier into ``to_currency`` for every currency in the snapshot.
+
+        ``to_currency`` itself always maps to 1.0, even when the snapshot lacks it.
+        """
+        target = to_currency.upper()
+        target_rate = self._per_base(target)
+        if target_rate is None:
+            return {target: 1.0}
+        factors = {code: target_rate / value for code, value in self.rates.items() if value}
+        factors[target] = 1.0
+        return factors
+
+    def _per_base(self, code: str) -> float | None:
+        return 1.0 if code == self.base else self.rates.get(code)
+
 
 class FxRatesClient:
     def __init__(
@@ -31,62 +64,42 @@ class FxRatesClient:
         self._timeout = timeout or DEFAULT_TIMEOUT
         self._max_retries = max_retries
         self._backoff_base = backoff_base
-        self._lock = threading.Lock()
-        self._cache: dict[str, FxCacheEntry] = {}
 
-    def get_rate(self, from_currency: str, to_currency: str) -> float | None:
-        base = from_currency.upper()
-        target = to_currency.upper()
-        if base == target:
-            return 1.0
-        rates = self._get_rates(base)
-        return rates.get(target)
-
-    def _get_rates(self, base: str) -> dict[str, float]:
-        now = time.time()
-        cached = self._cache.get(base)
-        if cached and cached.expires_at > now:
-            return cached.rates
-
-        with self._lock:
-            cached = self._cache.get(base)
-            if cached and cached.expires_at > now:
-                return cached.rates
-            rates, expires_at = self._fetch_rates(base)
-            self._cache[base] = FxCacheEntry(rates=rates, expires_at=expires_at)
-            return rates
-
-    def _fetch_rates(self, base: str) -> tuple[dict[str, float], float]:
-        response = request_with_retry(
+    async def fetch_snapshot_async(self, base: str) -> FxSnapshot:
+        response = await request_with_retry_async(
             "GET",
-            f"{OPEN_ER_API_BASE_URL}/{base}",
+            f"{OPEN_ER_API_BASE_URL}/{base.upper()}",
             timeout=self._timeout,
             max_retries=self._max_retries,
             backoff_base=self._backoff_base,
         )
-        response.raise_for_status()
-        payload = response.json()
-        if payload.get("result") != "success":
-            raise RuntimeError(f"FX rates API error: {payload.get('error-type')}")
-
-        rates = payload.get("rates")
-        if not isinstance(rates, dict):
-            raise RuntimeError("FX rates API response missing rates.")
-
-        now = time.time()
-        next_update = payload.get("time_next_update_unix")
-        expires_at = now + DEFAULT_FX_CACHE_TTL_SECONDS
-        if isinstance(next_update, (int, float)) and next_update > now:
-            expires_at = float(next_update)
-
-        parsed_rates: dict[str, float] = {}
-        for code, value in rates.items():
-            try:
-                parsed_rates[code] = float(value)
-            except (TypeError, ValueError):
-                continue
-
-        return parsed_rates, expires_at
+        return _parse_rates_response(response, base=base.upper())
+
+
+def _parse_rates_response(response: httpx.Response, *, base: str) -> FxSnapshot:
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get("result") != "success":
+        raise RuntimeError(f"FX rates API error: {payload.get('error-type')}")
+
+    rates = payload.get("rates")
+    if not isinstance(rates, dict):
+        raise RuntimeError("FX rates API response missing rates.")
+
+    now = time.time()
+    next_update = payload.get("time_next_update_unix")
+    expires_at = now + DEFAULT_FX_CACHE_TTL_SECONDS
+    if isinstance(next_update, (int, float)) and next_update > now:
+        expires_at = float(next_update)
+
+    parsed_rates: dict[str, float] = {}
+    for code, value in rates.items():
+        try:
+            parsed_rates[code] = float(value)
+        except (TypeError, ValueError):
+            continue
+
+    return FxSnapshot(base=base, rates=parsed_rates, fetched_at=now, expires_at=expires_at)
 
 
 _fx_client: FxRatesClient | None = None
@@ -1,15 +1,79 @@
 from __future__ import annotations
 
+import asyncio
+import random
+import threading
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import httpx
 
+from app.core.call_budget import consume_provider_call
+from app.core.circuit_breaker import CircuitBreaker, get_circuit_breaker
 from app.core.config import settings
+from app.core.deadline import DeadlineExceeded, remaining
+from app.core.hedging import get_hedger
+from app.core.rate_limit import get_rate_limiter
 
 
 DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=10.0, read=10.0)
 
+_clients: dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+_async_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def get_http_client(url: str) -> httpx.Client:
+    """Return the long-lived pooled client for the host serving ``url``."""
+    key = _client_key(url)
+    client = _clients.get(key)
+    if client is not None and not client.is_closed:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                timeout=DEFAULT_TIMEOUT,
+                limits=_build_limits(),
+                http2=settings.http_http2,
+                trust_env=settings.http_trust_env,
+            )
+            _clients[key] = client
+        return client
+
+
+def get_async_http_client(url: str) -> httpx.AsyncClient:
+    """Async counterpart of ``get_http_client``; clients live on the running event loop."""
+    key = _client_key(url)
+    client = _async_clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=_build_limits(),
+            http2=settings.http_http2,
+            trust_env=settings.http_trust_env,
+        )
+        _async_clients[key] = client
+    return client
+
+
+def close_http_clients() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_http_clients() -> None:
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    for client in clients:
+        await client.aclose()
+
 
 def request_with_retry(
     method: str,
@@ -21,33 +85,275 @@ def request_with_retry(
     timeout: httpx.Timeout | None = None,
     max_retries: int = 2,
     backoff_base: float = 0.5,
+) -> httpx.Response:
+    breaker = get_circuit_breaker(url)
+    if breaker is not None:
+        breaker.before_call()
+    try:
+        response = _send_with_retry(
+            method,
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            timeout=timeout or DEFAULT_TIMEOUT,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+        )
+    except (httpx.TimeoutException, httpx.TransportError):
+        if breaker is not None:
+            breaker.record_failure()
+        raise
+    except BaseException:
+        if breaker is not None:
+            breaker.cancel_call()
+        raise
+    if breaker is not None:
+        _record_outcome(breaker, response)
+    return response
+
+
+async def request_with_retry_async(
+    method: str,
+    url: str,
+    *,
+    params: dict[str, Any] | None = None,
+    data: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: httpx.Timeout | None = None,
+    max_retries: int = 2,
+    backoff_base: float = 0.5,
+) -> httpx.Response:
+    breaker = get_circuit_breaker(url)
+    if breaker is not None:
+        breaker.before_call()
+    try:
+        response = await _send_with_retry_async(
+            method,
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            timeout=timeout or DEFAULT_TIMEOUT,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+        )
+    except (httpx.TimeoutException, httpx.TransportError):
+        if breaker is not None:
+            breaker.record_failure()
+        raise
+    except BaseException:
+        if breaker is not None:
+            breaker.cancel_call()
+        raise
+    if breaker is not None:
+        _record_outcome(breaker, response)
+    return response
+
+
+def _send_with_retry(
+    method: str,
+    url: str,
+    *,
+    params: dict[str, Any] | None,
+    data: dict[str, Any] | None,
+    headers: dict[str, str] | None,
+    timeout: httpx.Timeout,
+    max_retries: int,
+    backoff_base: float,
 ) -> httpx.Response:
     last_exc: Exception | None = None
-    timeout = timeout or DEFAULT_TIMEOUT
+    client = get_http_client(url)
+    limiter = get_rate_limiter(url)
+    # Retries of the same request are not charged again.
+    consume_provider_call()
 
     for attempt in range(max_retries + 1):
+        # Every attempt counts against the provider's rate, retries included. The
+        # timeout is taken after the token so a throttled wait is not charged to it.
+        if limiter is not None:
+            limiter.acquire()
+        attempt_timeout = _deadline_timeout(timeout)
         try:
-            with httpx.Client(timeout=timeout, trust_env=settings.http_trust_env) as client:
-                response = client.request(
-                    method,
-                    url,
-                    params=params,
-                    data=data,
-                    headers=headers,
-                )
+            response = client.request(
+                method,
+                url,
+                params=params,
+                data=data,
+                headers=headers,
+                timeout=attempt_timeout,
+            )
         except (httpx.TimeoutException, httpx.TransportError) as exc:
+            _raise_if_deadline_cut(exc)
             last_exc = exc
-            if attempt < max_retries:
-                time.sleep(backoff_base * (2**attempt))
+            delay = _retry_delay(attempt, max_retries, backoff_base)
+            if delay is not None:
+                time.sleep(delay)
                 continue
             raise
 
-        if response.status_code == 429 or 500 <= response.status_code < 600:
-            if attempt < max_retries:
-                time.sleep(backoff_base * (2**attempt))
+        if _is_retryable_status(response.status_code):
+            delay = _retry_delay(attempt, max_retries, backoff_base, response)
+            if delay is not None:
+                time.sleep(delay)
                 continue
         return response
 
     if last_exc:
         raise last_exc
     raise RuntimeError("request_with_retry exhausted retries without response")
+
+
+async def _send_with_retry_async(
+    method: str,
+    url: str,
+    *,
+    params: dict[str, Any] | None,
+    data: dict[str, Any] | None,
+    headers: dict[str, str] | None,
+    timeout: httpx.Timeout,
+    max_retries: int,
+    backoff_base: float,
+) -> httpx.Response:
+    last_exc: Exception | None = None
+    client = get_async_http_client(url)
+    limiter = get_rate_limiter(url)
+    # Only idempotent reads are duplicated.
+    hedger = get_hedger(url) if method.upper() == "GET" else None
+    consume_provider_call()
+
+    for attempt in range(max_retries + 1):
+        # Every attempt counts against the provider's rate, retries included. The token
+        # is taken before the hedger starts timing; a hedge takes its own.
+        if limiter is not None:
+            await limiter.acquire_async()
+        attempt_timeout = _deadline_timeout(timeout)
+
+        async def send() -> httpx.Response:
+            return await client.request(
+                method,
+                url,
+                params=params,
+                data=data,
+                headers=headers,
+                timeout=attempt_timeout,
+            )
+
+        try:
+            response = await (
+                hedger.run(send, limiter=limiter) if hedger is not None else send()
+            )
+        except (httpx.TimeoutException, httpx.TransportError) as exc:
+            _raise_if_deadline_cut(exc)
+            last_exc = exc
+            delay = _retry_delay(attempt, max_retries, backoff_base)
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+            raise
+
+        if _is_retryable_status(response.status_code):
+            delay = _retry_delay(attempt, max_retries, backoff_base, response)
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+        return response
+
+    if last_exc:
+        raise last_exc
+    raise RuntimeError("request_with_retry_async exhausted retries without response")
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or 500 <= status_code < 600
+
+
+def _retry_delay(
+    attempt: int,
+    max_retries: int,
+    backoff_base: float,
+    response: httpx.Response | None = None,
+) -> float | None:
+    """Seconds to sleep before the next attempt, or ``None`` to stop retrying."""
+    if attempt >= max_retries:
+        return None
+    retry_after = _retry_after_seconds(response) if response is not None else None
+    if retry_after is not None:
+        # The provider says when to come back; later than we are willing to wait
+        # means give up now rather than retry early into another 429.
+        if retry_after > settings.http_retry_after_max_seconds:
+            return None
+        delay = retry_after
+    else:
+        # Full jitter keeps concurrent callers that failed together from retrying
+        # together.
+        delay = random.uniform(0, backoff_base * (2**attempt))
+    left = remaining()
+    if left is not None and delay >= left:
+        return None
+    return delay
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _deadline_timeout(timeout: httpx.Timeout) -> httpx.Timeout:
+    """Shrink ``timeout`` so a single attempt cannot outlive the current deadline."""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("deadline passed before the provider call")
+
+    def cap(value: float | None) -> float:
+        return left if value is None else min(value, left)
+
+    return httpx.Timeout(
+        connect=cap(timeout.connect),
+        read=cap(timeout.read),
+        write=cap(timeout.write),
+        pool=cap(timeout.pool),
+    )
+
+
+def _raise_if_deadline_cut(exc: Exception) -> None:
+    # An attempt whose timeout was shrunk to the deadline failed for lack of time, not
+    # because the provider is slow; report it as the caller's deadline.
+    left = remaining()
+    if isinstance(exc, httpx.TimeoutException) and left is not None and left <= 0:
+        raise DeadlineExceeded("deadline passed during the provider call") from exc
+
+
+def _record_outcome(breaker: CircuitBreaker, response: httpx.Response) -> None:
+    # Client errors (bad dates, unknown codes) say nothing about provider health.
+    if _is_retryable_status(response.status_code):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+def _client_key(url: str) -> str:
+    parsed = httpx.URL(url)
+    return f"{parsed.scheme}://{parsed.netloc.decode('ascii')}"
+
+
+def _build_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max(settings.http_max_connections, 1),
+        max_keepalive_connections=max(settings.http_max_keepalive_connections, 0),
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Generic, TypeVar, Union
+
+
+@dataclass(frozen=True, slots=True)
+class FlightEndpoint:
+    iata_code: str | None
+    at: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class FlightSegment:
+    departure: FlightEndpoint
+    arrival: FlightEndpoint
+    carrier_code: str | None
+    carrier_name: str | None
+    flight_number: str | None
+    duration: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class FlightItinerary:
+    duration: str | None
+    segments: tuple[FlightSegment, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class FlightOfferSummary:
+    id: str | None
+    name: str | None
+    currency: str | None
+    price_total: float | None
+    max_stops: int
+    itineraries: tuple[FlightItinerary, ...]
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class HotelOfferSummary:
+    id: str | None
+    name: str | None
+    city_code: str | None
+    currency: str | None
+    price_total: float | None
+    price_per_night_estimate: float | None
+    rating: str | None
+    address: dict[str, Any] | None
+    cancellation_policy: Any | None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+OfferT = TypeVar("OfferT", bound=Union[FlightOfferSummary, HotelOfferSummary])
+
+
+@dataclass(frozen=True, slots=True)
+class ConvertedOffer(Generic[OfferT]):
+    """An offer priced in the search currency.
+
+    Only the price is new; ``offer`` is the cached provider record, shared rather than
+    copied. ``to_dict`` renders the offer with the converted price in place.
+    """
+
+    offer: OfferT
+    currency: str
+    price_total: float
+    price_per_night_estimate: float | None = None
+
+    @property
+    def name(self) -> str | None:
+        return self.offer.name
+
+    def to_dict(self) -> dict[str, Any]:
+        data = self.offer.to_dict()
+        data["currency"] = self.currency
+        data["price_total"] = self.price_total
+        if "price_per_night_estimate" in data:
+            data["price_per_night_estimate"] = self.price_per_night_estimate
+        return data
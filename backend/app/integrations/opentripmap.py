@@ -6,10 +6,14 @@ from typing import Any
 import httpx
 
 from app.core.config import settings
-from app.integrations.http_utils import DEFAULT_TIMEOUT, request_with_retry
+from app.integrations.http_utils import (
+    DEFAULT_TIMEOUT,
+    request_with_retry,
+    request_with_retry_async,
+)
 
 
-class OpenTripMapClient:
+class _OpenTripMapClientBase:
     def __init__(
         self,
         *,
@@ -29,6 +33,24 @@ class OpenTripMapClient:
     def enabled(self) -> bool:
         return bool(self._api_key)
 
+    def _radius_params(
+        self,
+        *,
+        lat: float,
+        lon: float,
+        radius_meters: int,
+        limit: int,
+    ) -> dict[str, Any]:
+        return {
+            "apikey": self._api_key,
+            "lat": lat,
+            "lon": lon,
+            "radius": radius_meters,
+            "limit": limit,
+        }
+
+
+class OpenTripMapClient(_OpenTripMapClientBase):
     def list_pois_by_radius(
         self,
         *,
@@ -40,17 +62,39 @@ class OpenTripMapClient:
         if not self.enabled:
             return []
 
-        params: dict[str, Any] = {
-            "apikey": self._api_key,
-            "lat": lat,
-            "lon": lon,
-            "radius": radius_meters,
-            "limit": limit,
-        }
         response = request_with_retry(
             "GET",
             f"{self._base_url}/places/radius",
-            params=params,
+            params=self._radius_params(
+                lat=lat, lon=lon, radius_meters=radius_meters, limit=limit
+            ),
+            timeout=self._timeout,
+            max_retries=self._max_retries,
+            backoff_base=self._backoff_base,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        return _extract_pois(payload)
+
+
+class AsyncOpenTripMapClient(_OpenTripMapClientBase):
+    async def list_pois_by_radius(
+        self,
+        *,
+        lat: float,
+        lon: float,
+        radius_meters: int = 12000,
+        limit: int = 180,
+    ) -> list[dict[str, Any]]:
+        if not self.enabled:
+            return []
+
+        response = await request_with_retry_async(
+            "GET",
+            f"{self._base_url}/places/radius",
+            params=self._radius_params(
+                lat=lat, lon=lon, radius_meters=radius_meters, limit=limit
+            ),
             timeout=self._timeout,
             max_retries=self._max_retries,
             backoff_base=self._backoff_base,
@@ -99,3 +143,11 @@ def get_opentripmap_client() -> OpenTripMapClient:
         api_key=settings.opentripmap_api_key,
         base_url=settings.opentripmap_base_url,
     )
+
+
+@lru_cache
+def get_async_opentripmap_client() -> AsyncOpenTripMapClient:
+    return AsyncOpenTripMapClient(
+        api_key=settings.opentripmap_api_key,
+        base_url=settings.opentripmap_base_url,
+    )
@@ -0,0 +1,269 @@
+"""Preload OpenTripMap POIs for every itinerary city.
+
+One ``/places/radius`` call returns at most 180 places, so each city is swept as a
+grid of smaller radius queries. Tiles run concurrently (the OpenTripMap token bucket
+paces the requests), places are deduped by ``xid`` and each tile's places are written
+in one batch together with its row in ``poi_ingest_tile``. A rerun skips tiles
+completed within ``POI_SYNC_TTL_SECONDS``, so a crashed crawl picks up where it
+stopped.
+
+Usage::
+
+    python -m app.jobs.ingest_pois [--cities PAR,LON] [--grid 4] [--concurrency 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.logging import init_logging
+from app.integrations.http_utils import aclose_http_clients
+from app.integrations.opentripmap import get_async_opentripmap_client
+from app.models.itinerary import Poi, PoiIngestTile
+from app.services.itinerary_service import (
+    CITY_CENTER_LOOKUP,
+    record_poi_sync,
+    upsert_city_pois,
+)
+
+logger = logging.getLogger(__name__)
+
+CITY_RADIUS_METERS = 12000
+TILE_LIMIT = 180
+METERS_PER_DEGREE_LAT = 111_320.0
+
+
+@dataclass(frozen=True)
+class Tile:
+    city_code: str
+    grid: int
+    index: int
+    lat: float
+    lon: float
+    radius_meters: int
+
+
+def city_tiles(
+    city_code: str,
+    center: tuple[float, float],
+    *,
+    grid: int,
+    city_radius_meters: int = CITY_RADIUS_METERS,
+) -> list[Tile]:
+    """Split the square around the city circle into ``grid`` x ``grid`` tiles.
+
+    Each tile query is the circle through its square's corners, so neighbouring tiles
+    overlap slightly and nothing between them is missed. Tiles lying wholly outside the
+    city circle are dropped.
+    """
+    lat0, lon0 = center
+    step = 2 * city_radius_meters / grid
+    tile_radius = step / math.sqrt(2)
+    meters_per_degree_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat0))
+    tiles: list[Tile] = []
+    for row in range(grid):
+        for col in range(grid):
+            north = -city_radius_meters + (row + 0.5) * step
+            east = -city_radius_meters + (col + 0.5) * step
+            if math.hypot(north, east) > city_radius_meters + tile_radius:
+                continue
+            tiles.append(
+                Tile(
+                    city_code=city_code,
+                    grid=grid,
+                    index=row * grid + col,
+                    lat=round(lat0 + north / METERS_PER_DEGREE_LAT, 6),
+                    lon=round(lon0 + east / meters_per_degree_lon, 6),
+                    radius_meters=math.ceil(tile_radius),
+                )
+            )
+    return tiles
+
+
+async def ingest(
+    city_codes: list[str],
+    *,
+    grid: int,
+    concurrency: int,
+    restart: bool = False,
+) -> bool:
+    """Crawl ``city_codes``; returns ``False`` if any tile failed (it is retried next run)."""
+    client = get_async_opentripmap_client()
+    if not client.enabled:
+        raise SystemExit("OPENTRIPMAP_API_KEY is not configured.")
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    # xids already written by this run; tiles overlap, so neighbours repeat places.
+    seen: dict[str, set[str]] = {city_code: set() for city_code in city_codes}
+
+    async def run_tile(tile: Tile) -> bool:
+        try:
+            async with semaphore:
+                items = await client.list_pois_by_radius(
+                    lat=tile.lat,
+                    lon=tile.lon,
+                    radius_meters=tile.radius_meters,
+                    limit=TILE_LIMIT,
+                )
+        except Exception:
+            logger.exception("tile %s/%d failed", tile.city_code, tile.index)
+            return False
+        if len(items) >= TILE_LIMIT:
+            logger.warning(
+                "tile %s/%d hit the %d-place limit; a finer --grid would find more",
+                tile.city_code,
+                tile.index,
+                TILE_LIMIT,
+            )
+        fresh = _dedupe(items, seen[tile.city_code])
+        try:
+            await asyncio.to_thread(_store_tile, tile, list(fresh.values()))
+        except Exception:
+            logger.exception("tile %s/%d could not be stored", tile.city_code, tile.index)
+            return False
+        # Only now are the places in the database; until then other tiles keep them.
+        seen[tile.city_code].update(fresh)
+        logger.info(
+            "tile %s/%d: %d places, %d new", tile.city_code, tile.index, len(items), len(fresh)
+        )
+        return True
+
+    async def run_city(city_code: str) -> bool:
+        tiles = city_tiles(city_code, CITY_CENTER_LOOKUP[city_code], grid=grid)
+        try:
+            done = await asyncio.to_thread(_completed_tiles, city_code, grid, restart)
+        except Exception:
+            logger.exception("%s: could not read completed tiles", city_code)
+            return False
+        pending = [tile for tile in tiles if tile.index not in done]
+        if len(pending) < len(tiles):
+            logger.info(
+                "%s: resuming, %d of %d tiles done",
+                city_code,
+                len(tiles) - len(pending),
+                len(tiles),
+            )
+        results = await asyncio.gather(*(run_tile(tile) for tile in pending))
+        if not all(results):
+            return False
+        try:
+            poi_count = await asyncio.to_thread(_finish_city, city_code)
+        except Exception:
+            logger.exception("%s: could not record the sync", city_code)
+            return False
+        logger.info("%s: %d POIs stored", city_code, poi_count)
+        return True
+
+    try:
+        results = await asyncio.gather(*(run_city(city_code) for city_code in city_codes))
+    finally:
+        await aclose_http_clients()
+    return all(results)
+
+
+def _dedupe(items: list[dict[str, Any]], seen: set[str]) -> dict[str, dict[str, Any]]:
+    unique: dict[str, dict[str, Any]] = {}
+    for item in items:
+        xid = str(item.get("xid") or "").strip()
+        if xid and xid not in seen and xid not in unique:
+            unique[xid] = item
+    return unique
+
+
+def _completed_tiles(city_code: str, grid: int, restart: bool) -> set[int]:
+    with SessionLocal() as db:
+        if restart:
+            db.execute(delete(PoiIngestTile).where(PoiIngestTile.city_code == city_code))
+            db.commit()
+            return set()
+        fresh_after = _now() - timedelta(seconds=settings.poi_sync_ttl_seconds)
+        return set(
+            db.execute(
+                select(PoiIngestTile.tile_index).where(
+                    PoiIngestTile.city_code == city_code,
+                    PoiIngestTile.grid == grid,
+                    PoiIngestTile.completed_at > fresh_after,
+                )
+            ).scalars()
+        )
+
+
+def _store_tile(tile: Tile, items: list[dict[str, Any]]) -> None:
+    # The places and the tile marker commit together, so a crash never leaves a tile
+    # marked done without its places.
+    with SessionLocal() as db:
+        poi_count = upsert_city_pois(db, tile.city_code, items)
+        db.merge(
+            PoiIngestTile(
+                city_code=tile.city_code,
+                grid=tile.grid,
+                tile_index=tile.index,
+                poi_count=poi_count,
+                completed_at=_now(),
+            )
+        )
+        db.commit()
+
+
+def _finish_city(city_code: str) -> int:
+    with SessionLocal() as db:
+        poi_count = db.execute(
+            select(func.count()).select_from(Poi).where(Poi.city_code == city_code)
+        ).scalar_one()
+        record_poi_sync(db, city_code, poi_count)
+        db.commit()
+    return poi_count
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.jobs.ingest_pois",
+        description="Preload OpenTripMap POIs for itinerary cities.",
+    )
+    parser.add_argument(
+        "--cities",
+        help="comma-separated city codes (default: every city in CITY_CENTER_LOOKUP)",
+    )
+    parser.add_argument("--grid", type=int, default=4, help="tiles per side (default: 4)")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="tiles fetched at once (default: 4)"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore tiles completed by earlier runs"
+    )
+    args = parser.parse_args(argv)
+
+    if args.cities:
+        city_codes = [code.strip().upper() for code in args.cities.split(",") if code.strip()]
+    else:
+        city_codes = list(CITY_CENTER_LOOKUP)
+    unknown = [code for code in city_codes if code not in CITY_CENTER_LOOKUP]
+    if unknown:
+        parser.error(f"unsupported city codes: {', '.join(unknown)}")
+    if args.grid < 1:
+        parser.error("--grid must be at least 1")
+
+    init_logging()
+    ok = asyncio.run(
+        ingest(city_codes, grid=args.grid, concurrency=args.concurrency, restart=args.restart)
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,33 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
 from app.core.logging import init_logging
+from app.integrations.http_utils import aclose_http_clients, close_http_clients
 from app.routers.debug_flights import router as debug_flights_router
 from app.routers.debug_hotels import router as debug_hotels_router
+from app.routers.debug_metrics import router as debug_metrics_router
 from app.routers.itinerary import router as itinerary_router
 from app.routers.search import router as search_router
+from app.services.search_jobs import search_jobs
 
 init_logging()
 
-app = FastAPI(title="Vibecoder Travel Recommender")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    search_jobs.start()
+    yield
+    await search_jobs.stop()
+    close_http_clients()
+    await aclose_http_clients()
+
+
+app = FastAPI(title="Vibecoder Travel Recommender", lifespan=lifespan)
 app.include_router(debug_flights_router, prefix="/api/debug", tags=["debug"])
 app.include_router(debug_hotels_router, prefix="/api/debug", tags=["debug"])
+app.include_router(debug_metrics_router, prefix="/api/debug", tags=["debug"])
 app.include_router(search_router, prefix="/api", tags=["search"])
 app.include_router(itinerary_router, prefix="/api", tags=["itinerary"])
 
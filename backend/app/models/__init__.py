@@ -1,12 +1,20 @@
 from app.models.base import Base
-from app.models.itinerary import ItineraryPlan, ItineraryRequest, Poi
+from app.models.fx import FxRateSnapshot
+from app.models.hotel import HotelReference
+from app.models.itinerary import ItineraryPlan, ItineraryRequest, Poi, PoiCitySync, PoiIngestTile
+from app.models.rate_limit import RateLimitBucket
 from app.models.search import SearchRequest, SearchResult
 
 __all__ = [
     "Base",
     "SearchRequest",
     "SearchResult",
+    "HotelReference",
+    "FxRateSnapshot",
+    "RateLimitBucket",
     "Poi",
+    "PoiCitySync",
+    "PoiIngestTile",
     "ItineraryRequest",
     "ItineraryPlan",
 ]
@@ -23,6 +23,8 @@ class Poi(Base):
     wikidata_id: Mapped[str] = mapped_column(String(40), nullable=True)
     osm_id: Mapped[str] = mapped_column(String(80), nullable=True)
     raw_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # sha256 of the normalized row; bulk upserts leave rows whose hash is unchanged alone.
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -34,6 +36,26 @@ class Poi(Base):
     )
 
 
+class PoiCitySync(Base):
+    __tablename__ = "poi_city_sync"
+
+    city_code: Mapped[str] = mapped_column(String(3), primary_key=True)
+    poi_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Bumped on every sync; process-local POI snapshots of the city are valid for one.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+class PoiIngestTile(Base):
+    __tablename__ = "poi_ingest_tile"
+
+    city_code: Mapped[str] = mapped_column(String(3), primary_key=True)
+    grid: Mapped[int] = mapped_column(Integer, primary_key=True)
+    tile_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    poi_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class ItineraryRequest(Base):
     __tablename__ = "itinerary_request"
 
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from sqlalchemy import Double, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_bucket"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Double, nullable=False)
+    # Unix time of the last refill; shared clock for every process using the row.
+    refilled_at: Mapped[float] = mapped_column(Double, nullable=False)
@@ -15,6 +15,7 @@ class SearchRequest(Base):
     request_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
     payload_json: Mapped[dict] = mapped_column(JSON, nullable=False)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="created")
+    progress_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -6,13 +6,13 @@ from typing import Any
 from fastapi import APIRouter, HTTPException, Query
 from httpx import HTTPStatusError, RequestError
 
-from app.integrations.amadeus_flights import get_flights_client
+from app.integrations.amadeus_flights import get_async_flights_client
 
 router = APIRouter()
 
 
 @router.get("/flights")
-def debug_flights(
+async def debug_flights(
     origin: str = Query(..., min_length=3, max_length=3),
     destination: str = Query(..., min_length=3, max_length=3),
     date_from: date = Query(...),
@@ -20,9 +20,9 @@ def debug_flights(
     adults: int = Query(1, ge=1),
     max_stops: int | None = Query(None, ge=0),
 ) -> dict[str, Any]:
-    client = get_flights_client()
+    client = get_async_flights_client()
     try:
-        offers = client.search_offers(
+        offers = await client.search_offers(
             origin=origin.upper(),
             destination=destination.upper(),
             date_from=date_from,
@@ -50,7 +50,7 @@ def debug_flights(
             },
         ) from exc
 
-    return {"offers": offers}
+    return {"offers": [offer.to_dict() for offer in offers]}
 
 
 def _safe_json(response: Any) -> Any:
@@ -6,13 +6,13 @@ from typing import Any
 from fastapi import APIRouter, HTTPException, Query
 from httpx import HTTPStatusError, RequestError
 
-from app.integrations.amadeus_hotels import get_hotels_client
+from app.integrations.amadeus_hotels import get_async_hotels_client
 
 router = APIRouter()
 
 
 @router.get("/hotels")
-def debug_hotels(
+async def debug_hotels(
     city_code: str = Query(..., min_length=3, max_length=3),
     check_in: date = Query(...),
     check_out: date = Query(...),
@@ -20,9 +20,9 @@ def debug_hotels(
     max_price: float | None = Query(None, gt=0),
     stars_min: int | None = Query(None, ge=1, le=5),
 ) -> dict[str, Any]:
-    client = get_hotels_client()
+    client = get_async_hotels_client()
     try:
-        offers = client.search_offers(
+        offers = await client.search_offers(
             city_code=city_code.upper(),
             check_in=check_in,
             check_out=check_out,
@@ -50,7 +50,7 @@ def debug_hotels(
             },
         ) from exc
 
-    return {"offers": [offer.__dict__ for offer in offers]}
+    return {"offers": [offer.to_dict() for offer in offers]}
 
 
 def _safe_json(response: Any) -> Any:
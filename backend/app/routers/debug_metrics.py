@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core.circuit_breaker import circuit_breaker_stats
+from app.core.hedging import hedging_stats
+from app.core.rate_limit import rate_limit_stats
+from app.services.offer_cache import cache_stats
+from app.services.poi_cache import poi_snapshot_cache
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def debug_metrics() -> dict[str, Any]:
+    return {
+        "caches": {**cache_stats(), "poi_snapshots": poi_snapshot_cache.stats()},
+        "rate_limits": rate_limit_stats(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "hedging": hedging_stats(),
+    }
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from httpx import HTTPStatusError, RequestError
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
 from app.schemas.itinerary import ItineraryRequestIn, ItineraryResponse
-from app.services.itinerary_service import build_itinerary
+from app.services.itinerary_service import build_itinerary, ensure_city_pois
 
 router = APIRouter()
 
 
 @router.post("/itinerary", response_model=ItineraryResponse)
-def create_itinerary(
+async def create_itinerary(
     payload: ItineraryRequestIn,
     db: Session = Depends(get_db),
 ) -> ItineraryResponse:
     try:
-        result = build_itinerary(payload, db)
+        pois = await ensure_city_pois(payload.city_code)
+        result = await run_in_threadpool(build_itinerary, payload, db, pois=pois)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except HTTPStatusError as exc:
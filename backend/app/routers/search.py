@@ -1,116 +1,267 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from httpx import HTTPStatusError, RequestError
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.db import get_db
-from app.models.search import SearchRequest, SearchResult
-from app.schemas.search import SearchRequestIn, SearchResponse
-from app.services.recommend_service import build_recommendations, compute_request_hash
+from app.core.deadline import deadline_scope
+from app.models.search import SearchRequest
+from app.schemas.search import (
+    PriceCalendarRequestIn,
+    PriceCalendarResponse,
+    SearchRequestIn,
+    SearchResponse,
+)
+from app.services.recommend_service import build_price_calendar, compute_request_hash
+from app.services.search_jobs import SearchJob, search_jobs
+from app.services.search_service import (
+    get_latest_result,
+    get_or_create_search_request,
+    load_stale_result,
+    mark_search_failed,
+    mark_search_queued,
+    run_search,
+    search_providers_unavailable,
+    with_search_input,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/search", response_model=SearchResponse)
-def create_search(
+@router.post(
+    "/search",
+    response_model=SearchResponse,
+    responses={202: {"model": SearchResponse, "description": "Search accepted"}},
+)
+async def create_search(
     payload: SearchRequestIn,
+    mode: Literal["sync", "async"] = Query("sync"),
     db: Session = Depends(get_db),
-) -> SearchResponse:
+) -> SearchResponse | JSONResponse:
     request_hash = compute_request_hash(payload)
-    search_request = db.execute(
-        select(SearchRequest).where(SearchRequest.request_hash == request_hash)
-    ).scalar_one_or_none()
-
-    if search_request:
-        cached = _get_latest_result(db, search_request.id)
-        if cached and cached.expires_at > _now():
-            return SearchResponse(
-                **_with_search_input(cached.result_json, search_request.payload_json)
-            )
-    else:
-        search_request = SearchRequest(
-            request_hash=request_hash,
-            payload_json=payload.model_dump(mode="json"),
-            status="created",
+    search_request, cached = await run_in_threadpool(
+        get_or_create_search_request, db, payload, request_hash
+    )
+    if cached:
+        return SearchResponse(
+            **with_search_input(cached.result_json, search_request.payload_json)
         )
-        db.add(search_request)
-        db.commit()
-        db.refresh(search_request)
+
+    # While Amadeus is failing fast, an expired answer beats a 502.
+    if search_providers_unavailable():
+        stale = await run_in_threadpool(load_stale_result, search_request.id)
+        if stale is not None:
+            return SearchResponse(**stale)
+
+    if mode == "async":
+        return await _enqueue_search(payload, search_request, request_hash)
 
     try:
-        recommendations = build_recommendations(payload)
+        with deadline_scope(settings.search_deadline_seconds):
+            response_payload = await run_search(payload, search_request.id, request_hash)
+    except (HTTPStatusError, RequestError) as exc:
+        if search_providers_unavailable():
+            stale = await run_in_threadpool(load_stale_result, search_request.id)
+            if stale is not None:
+                return SearchResponse(**stale)
+        raise _to_http_exception(exc) from exc
     except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    except HTTPStatusError as exc:
-        status = exc.response.status_code
-        detail = {
-            "error": "amadeus_error",
-            "status_code": status,
-            "body": _safe_json(exc.response),
-        }
-        raise HTTPException(status_code=400 if 400 <= status < 500 else 502, detail=detail) from exc
-    except RequestError as exc:
-        raise HTTPException(
-            status_code=502,
-            detail={
-                "error": "amadeus_unreachable",
-                "message": str(exc),
-                "exception_type": type(exc).__name__,
-            },
-        ) from exc
-    fetched_at = _now()
-    expires_at = fetched_at + timedelta(seconds=settings.result_cache_ttl_seconds)
-    response_payload = {
-        "search_id": search_request.id,
-        "status": "done",
-        "fetched_at": fetched_at.isoformat(),
-        "expires_at": expires_at.isoformat(),
-        "search_input": search_request.payload_json,
-        "recommendations": recommendations,
-    }
-
-    result = SearchResult(
-        search_request_id=search_request.id,
-        result_json=response_payload,
-        fetched_at=fetched_at,
-        expires_at=expires_at,
-    )
-    search_request.status = "done"
-    db.add(result)
-    db.commit()
+        raise _to_http_exception(exc) from exc
 
     return SearchResponse(**response_payload)
 
 
+@router.post("/search/stream")
+async def stream_search(
+    payload: SearchRequestIn,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Stream one NDJSON ``city`` event per finished city, then a scored ``done`` event."""
+    request_hash = compute_request_hash(payload)
+    search_request, cached = await run_in_threadpool(
+        get_or_create_search_request, db, payload, request_hash
+    )
+    cached_payload = (
+        with_search_input(cached.result_json, search_request.payload_json)
+        if cached
+        else None
+    )
+    return StreamingResponse(
+        _stream_search_events(payload, search_request.id, request_hash, cached_payload),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/search/calendar", response_model=PriceCalendarResponse)
+async def price_calendar(payload: PriceCalendarRequestIn) -> PriceCalendarResponse:
+    """Price each city for every date pair within ``flex_days`` of the requested dates."""
+    try:
+        with deadline_scope(settings.search_deadline_seconds):
+            calendar = await build_price_calendar(payload)
+    except (ValueError, HTTPStatusError, RequestError) as exc:
+        raise _to_http_exception(exc) from exc
+    return PriceCalendarResponse(**calendar)
+
+
 @router.get("/search/{search_id}", response_model=SearchResponse)
 def get_search(search_id: int, db: Session = Depends(get_db)) -> SearchResponse:
     search_request = db.get(SearchRequest, search_id)
     if not search_request:
         raise HTTPException(status_code=404, detail="search_id not found")
 
-    latest = _get_latest_result(db, search_request.id)
+    if search_request.status in ("running", "failed"):
+        return SearchResponse(
+            search_id=search_request.id,
+            status=search_request.status,
+            search_input=search_request.payload_json,
+            progress=search_request.progress_json,
+        )
+
+    latest = get_latest_result(db, search_request.id)
     if not latest:
         raise HTTPException(status_code=404, detail="search result not found")
     return SearchResponse(
-        **_with_search_input(latest.result_json, search_request.payload_json)
+        **with_search_input(latest.result_json, search_request.payload_json)
     )
 
 
-def _get_latest_result(db: Session, search_request_id: int) -> SearchResult | None:
-    return db.execute(
-        select(SearchResult)
-        .where(SearchResult.search_request_id == search_request_id)
-        .order_by(SearchResult.fetched_at.desc())
-        .limit(1)
-    ).scalar_one_or_none()
+async def _enqueue_search(
+    payload: SearchRequestIn,
+    search_request: SearchRequest,
+    request_hash: str,
+) -> JSONResponse:
+    await run_in_threadpool(mark_search_queued, search_request.id)
+    job = SearchJob(
+        payload=payload,
+        search_request_id=search_request.id,
+        request_hash=request_hash,
+    )
+    if not search_jobs.submit(job):
+        await run_in_threadpool(
+            mark_search_failed,
+            search_request.id,
+            {"type": "QueueFull", "message": "search queue is full"},
+        )
+        raise HTTPException(
+            status_code=503,
+            detail={"error": "search_queue_full", "search_id": search_request.id},
+        )
+    accepted = SearchResponse(
+        search_id=search_request.id,
+        status="running",
+        search_input=search_request.payload_json,
+        progress={"completed": 0, "cities": []},
+    )
+    return JSONResponse(status_code=202, content=accepted.model_dump())
+
+
+async def _stream_search_events(
+    payload: SearchRequestIn,
+    search_request_id: int,
+    request_hash: str,
+    cached_payload: dict | None,
+) -> AsyncIterator[str]:
+    if cached_payload is not None:
+        total = len(cached_payload["recommendations"])
+        for index, recommendation in enumerate(cached_payload["recommendations"], start=1):
+            yield _city_event(recommendation, completed=index, total=total)
+        yield _ndjson({"event": "done", **cached_payload})
+        return
+
+    events: asyncio.Queue[tuple[dict, int] | None] = asyncio.Queue()
+
+    async def on_city_done(recommendation: dict, total: int) -> None:
+        # Copy now: scores are filled in on the shared dicts once every city is done.
+        await events.put((dict(recommendation), total))
+
+    # The search runs as its own task so it still completes and is stored if the
+    # client disconnects mid-stream.
+    with deadline_scope(settings.search_deadline_seconds):
+        search_task = asyncio.create_task(
+            run_search(payload, search_request_id, request_hash, on_city_done=on_city_done)
+        )
+    search_task.add_done_callback(lambda _: events.put_nowait(None))
+
+    streamed: set[str] = set()
+    while (item := await events.get()) is not None:
+        recommendation, total = item
+        streamed.add(recommendation["city_code"])
+        yield _city_event(recommendation, completed=len(streamed), total=total)
+
+    try:
+        response_payload = search_task.result()
+    except (ValueError, HTTPStatusError, RequestError) as exc:
+        http_exc = _to_http_exception(exc)
+        yield _ndjson(
+            {"event": "error", "status_code": http_exc.status_code, "detail": http_exc.detail}
+        )
+        return
+    except Exception as exc:
+        # Headers are long gone, so the stream must still end with a terminal event.
+        logger.exception("streamed search %s failed", search_request_id)
+        yield _ndjson(
+            {
+                "event": "error",
+                "status_code": 500,
+                "detail": {"error": "search_failed", "exception_type": type(exc).__name__},
+            }
+        )
+        return
+
+    # Joined an in-flight or stored search: no per-city callbacks fired, so replay them.
+    total = len(response_payload["recommendations"])
+    for recommendation in response_payload["recommendations"]:
+        if recommendation["city_code"] in streamed:
+            continue
+        streamed.add(recommendation["city_code"])
+        yield _city_event(recommendation, completed=len(streamed), total=total)
+    yield _ndjson({"event": "done", **response_payload})
+
+
+def _city_event(recommendation: dict, *, completed: int, total: int) -> str:
+    return _ndjson(
+        {
+            "event": "city",
+            "completed": completed,
+            "total": total,
+            "recommendation": recommendation,
+        }
+    )
+
+
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, separators=(",", ":")) + "\n"
 
 
-def _now() -> datetime:
-    return datetime.now(timezone.utc).replace(tzinfo=None)
+def _to_http_exception(exc: Exception) -> HTTPException:
+    if isinstance(exc, HTTPStatusError):
+        status = exc.response.status_code
+        detail = {
+            "error": "amadeus_error",
+            "status_code": status,
+            "body": _safe_json(exc.response),
+        }
+        return HTTPException(status_code=400 if 400 <= status < 500 else 502, detail=detail)
+    if isinstance(exc, RequestError):
+        return HTTPException(
+            status_code=502,
+            detail={
+                "error": "amadeus_unreachable",
+                "message": str(exc),
+                "exception_type": type(exc).__name__,
+            },
+        )
+    return HTTPException(status_code=400, detail=str(exc))
 
 
 def _safe_json(response: object) -> object:
@@ -118,9 +269,3 @@ def _safe_json(response: object) -> object:
         return response.json()  # type: ignore[attr-defined]
     except Exception:
         return str(response)
-
-
-def _with_search_input(result_json: dict, search_payload: dict) -> dict:
-    payload = dict(result_json)
-    payload["search_input"] = search_payload
-    return payload
@@ -29,8 +29,14 @@ class SearchRequestIn(BaseModel):
 
     @field_validator("continent", mode="before")
     @classmethod
-    def _upper_continent(cls, value: str) -> str:
-        return value.upper() if isinstance(value, str) else value
+    def _normalize_continent(cls, value: str) -> str:
+        # "ANY" or a comma-separated list; sorted so equivalent inputs hash the same.
+        if not isinstance(value, str):
+            return value
+        names = {name.strip().upper() for name in value.split(",") if name.strip()}
+        if "ANY" in names:
+            return "ANY"
+        return ",".join(sorted(names))
 
     @model_validator(mode="after")
     def _validate_dates(self) -> "SearchRequestIn":
@@ -39,10 +45,25 @@ class SearchRequestIn(BaseModel):
         return self
 
 
+class PriceCalendarRequestIn(SearchRequestIn):
+    flex_days: int = Field(1, ge=1, le=3)
+
+
 class SearchResponse(BaseModel):
     search_id: int
     status: str
-    fetched_at: str
-    expires_at: str
+    fetched_at: str | None = None
+    expires_at: str | None = None
     search_input: dict[str, Any] | None = None
-    recommendations: list[dict[str, Any]]
+    progress: dict[str, Any] | None = None
+    stale: bool = False
+    recommendations: list[dict[str, Any]] = Field(default_factory=list)
+
+
+class PriceCalendarResponse(BaseModel):
+    search_input: dict[str, Any]
+    flex_days: int
+    currency: str
+    cities: list[dict[str, Any]]
+    matrix: list[dict[str, Any]]
+    best: dict[str, Any] | None = None
@@ -1,15 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import logging
 import math
-from datetime import timedelta
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import Insert as MySqlInsert, insert as mysql_insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.integrations.opentripmap import get_opentripmap_client
-from app.models.itinerary import ItineraryPlan, ItineraryRequest, Poi
+from app.core.config import settings
+from app.core.db import NamedLock, SessionLocal
+from app.core.single_flight import SingleFlight
+from app.integrations.opentripmap import (
+    get_async_opentripmap_client,
+    get_opentripmap_client,
+)
+from app.models.itinerary import ItineraryPlan, ItineraryRequest, Poi, PoiCitySync
 from app.schemas.itinerary import ItineraryRequestIn, ItineraryStyle
+from app.services.poi_cache import PoiRecord, poi_snapshot_cache
+
+logger = logging.getLogger(__name__)
 
 SLOT_ORDER = ("morning", "lunch", "afternoon", "evening")
 
@@ -106,9 +121,116 @@ SYNTHETIC_POI_TEMPLATES: list[tuple[str, str, float, float]] = [
 ]
 
 
-def build_itinerary(payload: ItineraryRequestIn, db: Session) -> dict[str, Any]:
+async def fetch_city_pois(city_code: str) -> list[dict[str, Any]] | None:
+    """Fetch raw OpenTripMap POIs for ``city_code``; ``None`` when the provider is disabled."""
+    city_code = city_code.upper()
+    center = CITY_CENTER_LOOKUP.get(city_code)
+    if not center:
+        raise ValueError(f"Unsupported city_code for itinerary: {city_code}")
+
+    client = get_async_opentripmap_client()
+    if not client.enabled:
+        return None
+    return await client.list_pois_by_radius(lat=center[0], lon=center[1])
+
+
+async def ensure_city_pois(city_code: str) -> tuple[PoiRecord, ...] | None:
+    """Return the stored POIs of ``city_code``, syncing them first if it never was.
+
+    A city synced within ``POI_SYNC_TTL_SECONDS`` is served as is. A stale one is too,
+    while a background task refreshes it (stale-while-revalidate); only a city that was
+    never synced waits for OpenTripMap. The POIs come from the in-process snapshot
+    while its version matches ``poi_city_sync``. ``None`` means nothing is stored yet
+    and ``build_itinerary`` has to fall back.
+    """
+    city_code = city_code.upper()
+    if city_code not in CITY_CENTER_LOOKUP:
+        raise ValueError(f"Unsupported city_code for itinerary: {city_code}")
+    sync = await asyncio.to_thread(_load_poi_sync, city_code)
+    if sync is None:
+        await sync_city_pois(city_code)
+        sync = await asyncio.to_thread(_load_poi_sync, city_code)
+        if sync is None:
+            return None
+    elif not _is_poi_sync_fresh(sync):
+        _schedule_poi_refresh(city_code)
+
+    records = poi_snapshot_cache.get(city_code, sync.version)
+    if records is None:
+        records = await asyncio.to_thread(_load_city_poi_records, city_code)
+        if records:
+            poi_snapshot_cache.set(city_code, sync.version, records)
+    return records or None
+
+
+_poi_syncs: SingleFlight[str, None] = SingleFlight()
+_refresh_tasks: set[asyncio.Task[None]] = set()
+
+
+async def sync_city_pois(city_code: str) -> None:
+    """Fetch and store the POIs of ``city_code`` unless they are already fresh.
+
+    Concurrent callers in this process share one run; a named lock extends that to
+    other workers, which find the sync already done once they get the lock.
+    """
+    await _poi_syncs.run(city_code, lambda: _run_poi_sync(city_code))
+
+
+async def _run_poi_sync(city_code: str) -> None:
+    lock = NamedLock(f"poi_sync:{city_code}", settings.poi_sync_lock_timeout_seconds)
+    acquired = await lock.acquire_async()
+    try:
+        sync = await asyncio.to_thread(_load_poi_sync, city_code)
+        if sync is not None and _is_poi_sync_fresh(sync):
+            return
+        raw_items = await fetch_city_pois(city_code)
+        if raw_items is not None:
+            await asyncio.to_thread(_store_city_pois, city_code, raw_items)
+    finally:
+        if acquired:
+            await lock.release_async()
+
+
+def _schedule_poi_refresh(city_code: str) -> None:
+    if city_code in _poi_syncs:
+        return
+    task = asyncio.create_task(_refresh_city_pois(city_code), name=f"poi-refresh-{city_code}")
+    # The event loop only keeps weak references to tasks.
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _refresh_city_pois(city_code: str) -> None:
+    try:
+        await sync_city_pois(city_code)
+    except Exception:
+        # Nobody awaits this task; the stale POIs keep serving until the next try.
+        logger.exception("background POI refresh failed for %s", city_code)
+
+
+def _store_city_pois(city_code: str, raw_items: list[dict[str, Any]]) -> None:
+    with SessionLocal() as db:
+        _apply_poi_sync(db, city_code, raw_items)
+        db.commit()
+    # Other workers notice the version bump; this one can drop its snapshot now.
+    poi_snapshot_cache.invalidate(city_code)
+
+
+def build_itinerary(
+    payload: ItineraryRequestIn,
+    db: Session,
+    *,
+    raw_items: list[dict[str, Any]] | None = None,
+    pois: Sequence[PoiRecord] | None = None,
+) -> dict[str, Any]:
+    """Build and store itinerary variants.
+
+    ``pois`` from ``ensure_city_pois`` skip the POI sync and lookup entirely, leaving
+    the database only the plan to write.
+    """
     city_code = payload.city_code.upper()
-    pois = _sync_city_pois(db, city_code)
+    if pois is None:
+        pois = _sync_city_pois(db, city_code, raw_items=raw_items)
     if len(pois) < 4:
         raise ValueError("Not enough POIs available for this city.")
 
@@ -172,26 +294,24 @@ def _variant_styles(requested: ItineraryStyle) -> list[ItineraryStyle]:
     return variants
 
 
-def _sync_city_pois(db: Session, city_code: str) -> list[Poi]:
+def _sync_city_pois(
+    db: Session,
+    city_code: str,
+    *,
+    raw_items: list[dict[str, Any]] | None = None,
+) -> tuple[PoiRecord, ...]:
     city_code = city_code.upper()
     center = CITY_CENTER_LOOKUP.get(city_code)
     if not center:
         raise ValueError(f"Unsupported city_code for itinerary: {city_code}")
 
     client = get_opentripmap_client()
-    if client.enabled:
+    if raw_items is None and client.enabled and db.get(PoiCitySync, city_code) is None:
         raw_items = client.list_pois_by_radius(lat=center[0], lon=center[1])
-        normalized = _normalize_pois(city_code, raw_items)
-        if normalized:
-            _upsert_pois(db, normalized)
-            db.flush()
-
-    stored = db.execute(
-        select(Poi)
-        .where(Poi.city_code == city_code)
-        .order_by(Poi.rating.is_(None), Poi.rating.desc())
-    ).scalars().all()
+    if raw_items is not None:
+        _apply_poi_sync(db, city_code, raw_items)
 
+    stored = _load_poi_records(db, city_code)
     if stored:
         return stored
 
@@ -199,11 +319,7 @@ def _sync_city_pois(db: Session, city_code: str) -> list[Poi]:
     _upsert_pois(db, _build_synthetic_pois(city_code=city_code, center=center))
     db.flush()
 
-    fallback_rows = db.execute(
-        select(Poi)
-        .where(Poi.city_code == city_code)
-        .order_by(Poi.rating.is_(None), Poi.rating.desc())
-    ).scalars().all()
+    fallback_rows = _load_poi_records(db, city_code)
     if fallback_rows:
         return fallback_rows
 
@@ -215,6 +331,67 @@ def _sync_city_pois(db: Session, city_code: str) -> list[Poi]:
     )
 
 
+def _apply_poi_sync(db: Session, city_code: str, raw_items: list[dict[str, Any]]) -> None:
+    record_poi_sync(db, city_code, upsert_city_pois(db, city_code, raw_items))
+    db.flush()
+
+
+def upsert_city_pois(db: Session, city_code: str, raw_items: list[dict[str, Any]]) -> int:
+    """Normalize raw OpenTripMap items and upsert them; returns how many were usable."""
+    normalized = _normalize_pois(city_code, raw_items)
+    if normalized:
+        _upsert_pois(db, normalized)
+    return len(normalized)
+
+
+def record_poi_sync(db: Session, city_code: str, poi_count: int) -> None:
+    sync = db.get(PoiCitySync, city_code)
+    if sync is None:
+        sync = PoiCitySync(city_code=city_code)
+        db.add(sync)
+    sync.poi_count = poi_count
+    sync.synced_at = _now()
+    sync.version = (sync.version or 0) + 1
+
+
+def _is_poi_sync_fresh(sync: PoiCitySync) -> bool:
+    # A sync that stored nothing (no coverage, or a payload we could not read) is
+    # retried soon rather than pinning the city to synthetic POIs for the full TTL.
+    if sync.poi_count:
+        ttl_seconds = settings.poi_sync_ttl_seconds
+    else:
+        ttl_seconds = settings.poi_sync_empty_ttl_seconds
+    return _now() - sync.synced_at <= timedelta(seconds=ttl_seconds)
+
+
+def _load_poi_sync(city_code: str) -> PoiCitySync | None:
+    try:
+        with SessionLocal() as db:
+            return db.get(PoiCitySync, city_code)
+    except SQLAlchemyError:
+        logger.warning("poi_city_sync lookup failed for %s", city_code, exc_info=True)
+        return None
+
+
+def _load_city_poi_records(city_code: str) -> tuple[PoiRecord, ...]:
+    with SessionLocal() as db:
+        return _load_poi_records(db, city_code)
+
+
+def _load_poi_records(db: Session, city_code: str) -> tuple[PoiRecord, ...]:
+    # Only the columns itineraries use; raw_json is by far the largest and is skipped.
+    rows = db.execute(
+        select(Poi.id, Poi.city_code, Poi.name, Poi.kinds, Poi.lat, Poi.lon, Poi.rating)
+        .where(Poi.city_code == city_code)
+        .order_by(Poi.rating.is_(None), Poi.rating.desc())
+    ).all()
+    return tuple(PoiRecord(*row) for row in rows)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 def _normalize_pois(city_code: str, raw_items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     normalized: list[dict[str, Any]] = []
     for item in raw_items:
@@ -289,35 +466,84 @@ def _extract_lat_lon(item: dict[str, Any]) -> tuple[float | None, float | None]:
     return None, None
 
 
+_POI_UPSERT_COLUMNS = (
+    "city_code",
+    "external_source",
+    "name",
+    "kinds",
+    "lat",
+    "lon",
+    "rating",
+    "wikidata_id",
+    "osm_id",
+    "raw_json",
+)
+POI_UPSERT_BATCH_SIZE = 500
+
+
 def _upsert_pois(db: Session, items: list[dict[str, Any]]) -> None:
-    if not items:
+    """Insert or update POIs by ``external_id``, leaving rows whose content is unchanged.
+
+    On MySQL this is one ``INSERT ... ON DUPLICATE KEY UPDATE`` per batch, so concurrent
+    syncs of the same city cannot collide on the unique key. Other dialects fall back
+    to the ORM.
+    """
+    # Last occurrence wins, as it would with one UPDATE per item.
+    rows = {
+        item["external_id"]: {**item, "content_hash": _poi_content_hash(item)}
+        for item in items
+    }
+    if not rows:
+        return
+    if db.get_bind().dialect.name != "mysql":
+        _upsert_pois_orm(db, list(rows.values()))
         return
-    ext_ids = [item["external_id"] for item in items]
+    values = list(rows.values())
+    for start in range(0, len(values), POI_UPSERT_BATCH_SIZE):
+        db.execute(_poi_upsert_statement(values[start : start + POI_UPSERT_BATCH_SIZE]))
+
+
+def _poi_upsert_statement(rows: list[dict[str, Any]]) -> MySqlInsert:
+    table = Poi.__table__
+    stmt = mysql_insert(table).values(rows)
+    unchanged = table.c.content_hash == stmt.inserted.content_hash
+    # MySQL applies the assignments left to right, so content_hash must come last or
+    # the comparison would see the new hash.
+    assignments = [
+        (name, func.if_(unchanged, table.c[name], stmt.inserted[name]))
+        for name in _POI_UPSERT_COLUMNS
+    ]
+    # Core statements skip the column's ORM onupdate, so bump it here like the ORM
+    # path does for changed rows.
+    assignments.append(("updated_at", func.if_(unchanged, table.c.updated_at, func.now())))
+    assignments.append(("content_hash", stmt.inserted.content_hash))
+    return stmt.on_duplicate_key_update(assignments)
+
+
+def _upsert_pois_orm(db: Session, rows: list[dict[str, Any]]) -> None:
     existing = db.execute(
-        select(Poi).where(Poi.external_id.in_(ext_ids))
+        select(Poi).where(Poi.external_id.in_([row["external_id"] for row in rows]))
     ).scalars().all()
-    existing_by_id = {row.external_id: row for row in existing}
-
-    for item in items:
-        row = existing_by_id.get(item["external_id"])
-        if row:
-            row.city_code = item["city_code"]
-            row.external_source = item["external_source"]
-            row.name = item["name"]
-            row.kinds = item["kinds"]
-            row.lat = item["lat"]
-            row.lon = item["lon"]
-            row.rating = item["rating"]
-            row.wikidata_id = item["wikidata_id"]
-            row.osm_id = item["osm_id"]
-            row.raw_json = item["raw_json"]
-            continue
-        db.add(Poi(**item))
+    existing_by_id = {poi.external_id: poi for poi in existing}
+
+    for row in rows:
+        poi = existing_by_id.get(row["external_id"])
+        if poi is None:
+            db.add(Poi(**row))
+        elif poi.content_hash != row["content_hash"]:
+            for name in (*_POI_UPSERT_COLUMNS, "content_hash"):
+                setattr(poi, name, row[name])
+
+
+def _poi_content_hash(item: dict[str, Any]) -> str:
+    content = {name: item.get(name) for name in _POI_UPSERT_COLUMNS}
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
 
 
 def _build_variant_days(
     *,
-    pois: list[Poi],
+    pois: Sequence[PoiRecord],
     date_from: Any,
     date_to: Any,
     style: ItineraryStyle,
@@ -328,7 +554,7 @@ def _build_variant_days(
 
     days: list[dict[str, Any]] = []
     used_primary_ids: set[int] = set()
-    previous_primary: Poi | None = None
+    previous_primary: PoiRecord | None = None
 
     for day_index in range(days_count):
         current_date = date_from + timedelta(days=day_index)
@@ -360,13 +586,13 @@ def _build_variant_days(
 
 def _slot_alternatives(
     *,
-    pois: list[Poi],
+    pois: Sequence[PoiRecord],
     slot: str,
     style: ItineraryStyle,
     pace: str,
     used_primary_ids: set[int],
-    previous_primary: Poi | None,
-) -> tuple[list[dict[str, Any]], Poi | None]:
+    previous_primary: PoiRecord | None,
+) -> tuple[list[dict[str, Any]], PoiRecord | None]:
     ranked = sorted(
         pois,
         key=lambda poi: _poi_score(
@@ -380,7 +606,7 @@ def _slot_alternatives(
     )
 
     alternatives: list[dict[str, Any]] = []
-    selected_rows: list[Poi] = []
+    selected_rows: list[PoiRecord] = []
     selected_ids: set[int] = set()
 
     for poi in ranked:
@@ -424,11 +650,11 @@ def _slot_alternatives(
 
 def _build_alternative(
     *,
-    poi: Poi,
+    poi: PoiRecord,
     slot: str,
     style: ItineraryStyle,
     pace: str,
-    previous_primary: Poi | None,
+    previous_primary: PoiRecord | None,
 ) -> dict[str, Any]:
     kinds = _split_kinds(poi.kinds)
     return {
@@ -453,11 +679,11 @@ def _build_alternative(
 
 def _poi_score(
     *,
-    poi: Poi,
+    poi: PoiRecord,
     style: ItineraryStyle,
     slot: str,
     used_primary_ids: set[int],
-    previous_primary: Poi | None,
+    previous_primary: PoiRecord | None,
 ) -> float:
     kinds = _split_kinds(poi.kinds)
     score = float(poi.rating or 0.0)
@@ -494,7 +720,9 @@ def _estimate_visit_minutes(*, kinds: set[str], slot: str, pace: str) -> int:
     return max(45, min(total, 210))
 
 
-def _estimate_travel_minutes(*, previous: Poi | None, current: Poi, pace: str) -> int:
+def _estimate_travel_minutes(
+    *, previous: PoiRecord | None, current: PoiRecord, pace: str
+) -> int:
     distance = _distance_km(previous, current)
     if distance is None:
         return 20
@@ -505,11 +733,11 @@ def _estimate_travel_minutes(*, previous: Poi | None, current: Poi, pace: str) -
 
 def _build_reasons(
     *,
-    poi: Poi,
+    poi: PoiRecord,
     kinds: set[str],
     style: ItineraryStyle,
     slot: str,
-    previous_primary: Poi | None,
+    previous_primary: PoiRecord | None,
 ) -> list[str]:
     reasons: list[str] = []
     if _matches_style(kinds, style):
@@ -554,7 +782,7 @@ def _split_kinds(value: str | None) -> set[str]:
     return {piece.strip() for piece in value.split(",") if piece.strip()}
 
 
-def _distance_km(previous: Poi | None, current: Poi) -> float | None:
+def _distance_km(previous: PoiRecord | None, current: PoiRecord) -> float | None:
     if previous is None:
         return None
     if previous.lat is None or previous.lon is None:
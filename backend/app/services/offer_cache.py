@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, NamedTuple
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.core.cache import TtlLruCache
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.single_flight import SingleFlight
+from app.integrations.amadeus_flights import AsyncAmadeusFlightsClient, RawFlightOffers
+from app.integrations.amadeus_hotels import AsyncAmadeusHotelsClient
+from app.integrations.fx_rates import FxRatesClient, FxSnapshot
+from app.integrations.offers import HotelOfferSummary
+from app.models.fx import FxRateSnapshot
+from app.models.hotel import HotelReference
+
+logger = logging.getLogger(__name__)
+
+
+class FlightLegKey(NamedTuple):
+    origin: str
+    destination: str
+    date_from: date
+    date_to: date | None
+    adults: int
+    currency: str | None
+    non_stop: bool = False
+
+
+class DestinationMonthKey(NamedTuple):
+    origin: str
+    month: str  # YYYY-MM of the departure date
+
+
+class HotelReferenceKey(NamedTuple):
+    city_code: str
+    stars_min: int | None
+
+
+class HotelStayKey(NamedTuple):
+    city_code: str
+    check_in: date
+    check_out: date
+    adults: int
+    stars_min: int | None
+    currency: str | None
+
+
+# Raw offers per leg, unconverted. maxPrice is deliberately not part of the key: an
+# entry fetched under a per-traveler cap serves every search with the same or a lower
+# cap (or no cap at all when fetched uncapped), and stop/price filters, summarizing and
+# currency conversion are applied per search on top of it.
+flight_offer_cache: TtlLruCache[FlightLegKey, RawFlightOffers] = TtlLruCache(
+    ttl_seconds=settings.flight_cache_ttl_seconds,
+    max_entries=settings.flight_cache_max_entries,
+)
+
+
+async def get_flight_leg_offers(
+    flights_client: AsyncAmadeusFlightsClient,
+    key: FlightLegKey,
+    *,
+    max_price: int | None = None,
+) -> RawFlightOffers:
+    async def load() -> RawFlightOffers:
+        return await flights_client.search_raw_offers(
+            origin=key.origin,
+            destination=key.destination,
+            date_from=key.date_from,
+            date_to=key.date_to,
+            adults=key.adults,
+            currency_code=key.currency,
+            non_stop=key.non_stop,
+            max_price=max_price,
+        )
+
+    def covers(entry: RawFlightOffers) -> bool:
+        if entry.max_price is None:
+            return True
+        return max_price is not None and max_price <= entry.max_price
+
+    return await flight_offer_cache.get_or_load(key, load, accept=covers)
+
+
+# Cheapest known price per destination for an origin and departure month. Amadeus
+# serves these from its own pre-computed cache, so they are cheap and only used to
+# rank candidate cities before the full offer search.
+flight_destination_cache: TtlLruCache[DestinationMonthKey, dict[str, float]] = TtlLruCache(
+    ttl_seconds=settings.flight_destinations_ttl_seconds,
+    max_entries=settings.flight_destinations_max_entries,
+)
+
+
+async def get_cheapest_destinations(
+    flights_client: AsyncAmadeusFlightsClient,
+    key: DestinationMonthKey,
+) -> dict[str, float]:
+    async def load() -> dict[str, float]:
+        departure_from, departure_to = _month_range(key.month)
+        return await flights_client.cheapest_destinations(
+            origin=key.origin,
+            departure_from=departure_from,
+            departure_to=departure_to,
+        )
+
+    return await flight_destination_cache.get_or_load(key, load)
+
+
+# Tier 1: the by-city hotel list barely changes, so it is kept for days in memory and
+# in the hotel_reference table so restarts and other workers start warm.
+hotel_reference_cache: TtlLruCache[HotelReferenceKey, list[dict[str, Any]]] = TtlLruCache(
+    ttl_seconds=settings.hotel_reference_ttl_seconds,
+    max_entries=settings.hotel_reference_max_entries,
+)
+hotel_reference_db_stats = {"hits": 0, "misses": 0}
+
+# Tier 2: priced offers per stay, unconverted.
+hotel_offer_cache: TtlLruCache[HotelStayKey, list[HotelOfferSummary]] = TtlLruCache(
+    ttl_seconds=settings.hotel_offer_cache_ttl_seconds,
+    max_entries=settings.hotel_offer_cache_max_entries,
+)
+
+
+async def get_city_hotels(
+    hotels_client: AsyncAmadeusHotelsClient,
+    key: HotelReferenceKey,
+) -> list[dict[str, Any]]:
+    async def load() -> list[dict[str, Any]]:
+        stored = await asyncio.to_thread(_load_hotel_reference, key)
+        if stored is not None:
+            hotel_reference_db_stats["hits"] += 1
+            return stored
+        hotel_reference_db_stats["misses"] += 1
+        hotels = await hotels_client.list_hotels_by_city(
+            city_code=key.city_code,
+            stars_min=key.stars_min,
+        )
+        await asyncio.to_thread(_store_hotel_reference, key, hotels)
+        return hotels
+
+    return await hotel_reference_cache.get_or_load(key, load)
+
+
+async def get_hotel_stay_offers(
+    hotels_client: AsyncAmadeusHotelsClient,
+    key: HotelStayKey,
+) -> list[HotelOfferSummary]:
+    async def load() -> list[HotelOfferSummary]:
+        hotels = await get_city_hotels(
+            hotels_client,
+            HotelReferenceKey(city_code=key.city_code, stars_min=key.stars_min),
+        )
+        return await hotels_client.search_offers_for_hotels(
+            hotels,
+            city_code=key.city_code,
+            check_in=key.check_in,
+            check_out=key.check_out,
+            adults=key.adults,
+            currency_code=key.currency,
+        )
+
+    return await hotel_offer_cache.get_or_load(key, load)
+
+
+# FX: one table of rates against settings.fx_base_currency serves every currency pair.
+# It is kept in memory until the provider's next update and in fx_rate_snapshot so
+# restarts and other workers skip the fetch. When a refresh fails the last snapshot
+# keeps being served, and the refresh is retried after FX_REFRESH_RETRY_SECONDS.
+FX_REFRESH_RETRY_SECONDS = 300
+fx_snapshots: dict[str, FxSnapshot] = {}
+fx_snapshot_stats = {"hits": 0, "db_hits": 0, "fetches": 0, "stale_served": 0}
+_fx_inflight: SingleFlight[str, FxSnapshot] = SingleFlight()
+
+
+async def get_fx_snapshot(fx_client: FxRatesClient) -> FxSnapshot:
+    base = settings.fx_base_currency.upper()
+    snapshot = fx_snapshots.get(base)
+    if snapshot is not None and snapshot.expires_at > time.time():
+        fx_snapshot_stats["hits"] += 1
+        return snapshot
+
+    async def load() -> FxSnapshot:
+        stored = await asyncio.to_thread(_load_fx_snapshot, base)
+        if stored is not None and stored.expires_at > time.time():
+            fx_snapshot_stats["db_hits"] += 1
+            fx_snapshots[base] = stored
+            return stored
+        try:
+            fetched = await fx_client.fetch_snapshot_async(base)
+        except (httpx.HTTPError, RuntimeError):
+            fallback = fx_snapshots.get(base) or stored
+            if fallback is None:
+                raise
+            logger.warning(
+                "FX refresh failed for %s; serving snapshot fetched at %s",
+                base,
+                fallback.fetched_at,
+                exc_info=True,
+            )
+            fx_snapshot_stats["stale_served"] += 1
+            retry = replace(fallback, expires_at=time.time() + FX_REFRESH_RETRY_SECONDS)
+            fx_snapshots[base] = retry
+            return retry
+        fx_snapshot_stats["fetches"] += 1
+        fx_snapshots[base] = fetched
+        await asyncio.to_thread(_store_fx_snapshot, fetched)
+        return fetched
+
+    return await _fx_inflight.run(base, load)
+
+
+def cache_stats() -> dict[str, Any]:
+    return {
+        "flight_offers": flight_offer_cache.stats(),
+        "flight_destinations": flight_destination_cache.stats(),
+        "hotel_reference": {
+            **hotel_reference_cache.stats(),
+            "db_hits": hotel_reference_db_stats["hits"],
+            "db_misses": hotel_reference_db_stats["misses"],
+        },
+        "hotel_offers": hotel_offer_cache.stats(),
+        "fx_snapshot": {"entries": len(fx_snapshots), **fx_snapshot_stats},
+    }
+
+
+def _month_range(month: str) -> tuple[date, date]:
+    first = date.fromisoformat(f"{month}-01")
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    # Amadeus rejects departure dates in the past.
+    return min(max(first, date.today()), last), last
+
+
+def _ratings_key(stars_min: int | None) -> str:
+    return "any" if stars_min is None else str(stars_min)
+
+
+def _load_hotel_reference(key: HotelReferenceKey) -> list[dict[str, Any]] | None:
+    try:
+        with SessionLocal() as db:
+            row = db.execute(
+                select(HotelReference).where(
+                    HotelReference.city_code == key.city_code,
+                    HotelReference.ratings_key == _ratings_key(key.stars_min),
+                )
+            ).scalar_one_or_none()
+    except SQLAlchemyError:
+        logger.warning("hotel_reference lookup failed for %s", key, exc_info=True)
+        return None
+    if row is None or row.expires_at <= _now():
+        return None
+    return row.hotels_json
+
+
+def _store_hotel_reference(key: HotelReferenceKey, hotels: list[dict[str, Any]]) -> None:
+    fetched_at = _now()
+    expires_at = fetched_at + timedelta(seconds=settings.hotel_reference_ttl_seconds)
+    try:
+        with SessionLocal() as db:
+            row = db.execute(
+                select(HotelReference).where(
+                    HotelReference.city_code == key.city_code,
+                    HotelReference.ratings_key == _ratings_key(key.stars_min),
+                )
+            ).scalar_one_or_none()
+            if row is None:
+                row = HotelReference(
+                    city_code=key.city_code,
+                    ratings_key=_ratings_key(key.stars_min),
+                )
+                db.add(row)
+            row.hotels_json = hotels
+            row.fetched_at = fetched_at
+            row.expires_at = expires_at
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker stored the same city first; its copy is as good as ours.
+                db.rollback()
+    except SQLAlchemyError:
+        logger.warning("hotel_reference store failed for %s", key, exc_info=True)
+
+
+def _load_fx_snapshot(base: str) -> FxSnapshot | None:
+    try:
+        with SessionLocal() as db:
+            row = db.get(FxRateSnapshot, base)
+    except SQLAlchemyError:
+        logger.warning("fx_rate_snapshot lookup failed for %s", base, exc_info=True)
+        return None
+    if row is None:
+        return None
+    return FxSnapshot(
+        base=row.base_currency,
+        rates={code: float(value) for code, value in row.rates_json.items()},
+        fetched_at=_to_unix(row.fetched_at),
+        expires_at=_to_unix(row.expires_at),
+    )
+
+
+def _store_fx_snapshot(snapshot: FxSnapshot) -> None:
+    try:
+        with SessionLocal() as db:
+            row = db.get(FxRateSnapshot, snapshot.base)
+            if row is None:
+                row = FxRateSnapshot(base_currency=snapshot.base)
+                db.add(row)
+            row.rates_json = snapshot.rates
+            row.fetched_at = _from_unix(snapshot.fetched_at)
+            row.expires_at = _from_unix(snapshot.expires_at)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker stored the same base first; its copy is as good as ours.
+                db.rollback()
+    except SQLAlchemyError:
+        logger.warning("fx_rate_snapshot store failed for %s", snapshot.base, exc_info=True)
+
+
+def _to_unix(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _from_unix(value: float) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
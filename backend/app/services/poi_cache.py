@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+from typing import Any
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class PoiRecord:
+    """The columns itinerary generation reads from a ``poi`` row, without ``raw_json``."""
+
+    id: int
+    city_code: str
+    name: str
+    kinds: str | None
+    lat: float | None
+    lon: float | None
+    rating: float | None
+
+
+class PoiSnapshotCache:
+    """Process-local POI lists per city, each valid for one sync version of the city.
+
+    ``record_poi_sync`` bumps the version in ``poi_city_sync``, so a sync in any worker
+    makes the other workers' snapshots miss on their next lookup. The number of cities
+    is LRU-bounded; ``max_cities <= 0`` disables the cache.
+    """
+
+    def __init__(self, *, max_cities: int) -> None:
+        self._max_cities = max_cities
+        self._entries: OrderedDict[str, tuple[int, tuple[PoiRecord, ...], int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, city_code: str, version: int) -> tuple[PoiRecord, ...] | None:
+        with self._lock:
+            entry = self._entries.get(city_code)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(city_code)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, city_code: str, version: int, records: tuple[PoiRecord, ...]) -> None:
+        if self._max_cities <= 0:
+            return
+        size = sum(_record_bytes(record) for record in records)
+        with self._lock:
+            self._entries[city_code] = (version, records, size)
+            self._entries.move_to_end(city_code)
+            while len(self._entries) > self._max_cities:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, city_code: str) -> None:
+        with self._lock:
+            self._entries.pop(city_code, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "cities": len(entries),
+            "pois": sum(len(records) for _, records, _ in entries),
+            "bytes": sum(size for _, _, size in entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _record_bytes(record: PoiRecord) -> int:
+    # Shallow sizes of the record and its field values; shared strings are counted
+    # once per record, so this is an upper bound.
+    return sys.getsizeof(record) + sum(
+        sys.getsizeof(value) for value in astuple(record) if value is not None
+    )
+
+
+poi_snapshot_cache = PoiSnapshotCache(max_cities=settings.poi_snapshot_max_cities)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import re
+from dataclasses import astuple, dataclass
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+
+FEATURES = ("price", "stops", "duration", "rating", "budget_slack")
+
+# +1 where a higher value is better, -1 where a lower one is.
+_DIRECTIONS = np.array([-1.0, -1.0, -1.0, 1.0, 1.0])
+# Columns min-max rescaled across the cities of a search. budget_slack is already a
+# 0-1 share of the budget; rescaled it would just repeat the price column.
+_RESCALED = np.array([True, True, True, True, False])
+
+_ISO_DURATION = re.compile(
+    r"^P(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$"
+)
+
+
+@dataclass(frozen=True)
+class RankingWeights:
+    """Relative weight of each feature in the score; negative weights count as zero."""
+
+    price: float = 0.5
+    stops: float = 0.15
+    duration: float = 0.15
+    rating: float = 0.1
+    budget_slack: float = 0.1
+
+    @classmethod
+    def from_settings(cls) -> RankingWeights:
+        return cls(
+            price=settings.ranking_weight_price,
+            stops=settings.ranking_weight_stops,
+            duration=settings.ranking_weight_duration,
+            rating=settings.ranking_weight_rating,
+            budget_slack=settings.ranking_weight_budget_slack,
+        )
+
+    def as_array(self) -> np.ndarray:
+        return np.clip(np.array(astuple(self), dtype=float), 0.0, None)
+
+
+def feature_matrix(
+    recommendations: list[dict[str, Any]],
+    *,
+    budget_total: float,
+) -> np.ndarray:
+    """One row per recommendation, one column per name in ``FEATURES``; NaN when unknown.
+
+    ``budget_slack`` is the share of ``budget_total`` left after the total, clipped to
+    [0, 1] so every over-budget city gets 0. Offers of every city are flattened into
+    parallel arrays and reduced per city with ``ufunc.at``, so the cost is one pass
+    over offers however many cities there are.
+    """
+    matrix = np.full((len(recommendations), len(FEATURES)), np.nan)
+    if not recommendations:
+        return matrix
+
+    matrix[:, 0] = [
+        np.nan if rec.get("total_estimate") is None else rec["total_estimate"]
+        for rec in recommendations
+    ]
+
+    flight_city: list[int] = []
+    stops: list[float] = []
+    durations: list[float] = []
+    hotel_city: list[int] = []
+    ratings: list[float] = []
+    for index, rec in enumerate(recommendations):
+        for offer in (rec.get("flight") or {}).get("top_offers") or []:
+            flight_city.append(index)
+            stops.append(_to_float(offer.get("max_stops")))
+            durations.append(_offer_duration_minutes(offer))
+        for offer in (rec.get("hotel") or {}).get("top_offers") or []:
+            hotel_city.append(index)
+            ratings.append(_to_float(offer.get("rating")))
+
+    # fmin/fmax skip NaN, so a city keeps NaN only when none of its offers has a value.
+    np.fmin.at(matrix[:, 1], np.array(flight_city, dtype=int), np.array(stops))
+    np.fmin.at(matrix[:, 2], np.array(flight_city, dtype=int), np.array(durations))
+    np.fmax.at(matrix[:, 3], np.array(hotel_city, dtype=int), np.array(ratings))
+    if budget_total > 0:
+        matrix[:, 4] = np.clip((budget_total - matrix[:, 0]) / budget_total, 0.0, 1.0)
+    return matrix
+
+
+def score_matrix(matrix: np.ndarray, weights: RankingWeights) -> np.ndarray:
+    """Weighted sum of features on a 0-1 scale, rounded to 3 places.
+
+    Each column is oriented so 1 is best and, except ``budget_slack``, min-max
+    normalized across rows. A rescaled column where every known value ties scores 1 for
+    those rows; unknown values score 0, and a column with no known value at all drops
+    out of the weighting. Rows without a price score 0 overall.
+    """
+    if matrix.shape[0] == 0:
+        return np.zeros(0)
+    oriented = matrix * _DIRECTIONS
+    low = np.fmin.reduce(oriented, axis=0)
+    high = np.fmax.reduce(oriented, axis=0)
+    span = high - low
+    normalized = np.divide(
+        oriented - low,
+        span,
+        out=np.ones_like(oriented),
+        where=span > 0,
+    )
+    normalized = np.where(_RESCALED, normalized, matrix)
+    normalized[np.isnan(oriented)] = 0.0
+
+    weight_array = np.where(np.isnan(low), 0.0, weights.as_array())
+    weight_total = weight_array.sum()
+    if weight_total <= 0:
+        return np.zeros(matrix.shape[0])
+    scores = normalized @ (weight_array / weight_total)
+    scores[np.isnan(matrix[:, 0])] = 0.0
+    return np.round(scores, 3)
+
+
+def score_recommendations(
+    recommendations: list[dict[str, Any]],
+    *,
+    budget_total: float,
+    weights: RankingWeights | None = None,
+) -> list[float]:
+    matrix = feature_matrix(recommendations, budget_total=budget_total)
+    return score_matrix(matrix, weights or RankingWeights.from_settings()).tolist()
+
+
+def _offer_duration_minutes(offer: dict[str, Any]) -> float:
+    total = 0.0
+    for itinerary in offer.get("itineraries") or []:
+        minutes = parse_iso_duration(itinerary.get("duration"))
+        if minutes is None:
+            return np.nan
+        total += minutes
+    return total if total > 0 else np.nan
+
+
+@lru_cache(maxsize=4096)
+def parse_iso_duration(value: str | None) -> float | None:
+    """Minutes in an ISO-8601 duration such as ``PT2H30M`` or ``P1DT4H``."""
+    if not value:
+        return None
+    match = _ISO_DURATION.match(value)
+    if match is None or value in ("P", "PT"):
+        return None
+    days, hours, minutes, seconds = (
+        float(match.group(name) or 0) for name in ("days", "hours", "minutes", "seconds")
+    )
+    return days * 1440 + hours * 60 + minutes + seconds / 60
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
@@ -1,19 +1,49 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
-from dataclasses import asdict
-from datetime import date
-from typing import Any
+import logging
+import math
+from datetime import date, timedelta
+from itertools import zip_longest
+from typing import Any, Awaitable, Callable, Sequence
 
-from app.core.config import settings
-from app.integrations.amadeus_flights import get_flights_client
-from app.integrations.amadeus_hotels import HotelOfferSummary, get_hotels_client
-from app.integrations.fx_rates import FxRatesClient, get_fx_client
-from app.schemas.search import SearchRequestIn
+import httpx
 
+from app.core.call_budget import ProviderCallBudgetExceeded, provider_call_budget
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded, run_within_deadline
+from app.integrations.amadeus_flights import (
+    AsyncAmadeusFlightsClient,
+    get_async_flights_client,
+    select_offers,
+)
+from app.integrations.amadeus_hotels import AsyncAmadeusHotelsClient, get_async_hotels_client
+from app.integrations.fx_rates import get_fx_client
+from app.integrations.offers import ConvertedOffer, FlightOfferSummary, HotelOfferSummary
+from app.schemas.search import PriceCalendarRequestIn, SearchRequestIn
+from app.services.offer_cache import (
+    DestinationMonthKey,
+    FlightLegKey,
+    HotelStayKey,
+    get_cheapest_destinations,
+    get_flight_leg_offers,
+    get_fx_snapshot,
+    get_hotel_stay_offers,
+)
+from app.services.ranking import score_recommendations
+
+logger = logging.getLogger(__name__)
 
 CityCandidate = dict[str, str]
+FlightOffer = ConvertedOffer[FlightOfferSummary]
+HotelOffer = ConvertedOffer[HotelOfferSummary]
+# Called with each finished city recommendation and the number of candidate cities.
+CityDoneCallback = Callable[[dict[str, Any], int], Awaitable[None]]
+# Failures that end one price-calendar cell instead of the whole calendar: provider
+# errors mark it ``error``; a spent call budget or deadline leaves it ``incomplete``.
+_CALENDAR_CELL_ERRORS = (httpx.HTTPError, ProviderCallBudgetExceeded, DeadlineExceeded)
 
 CONTINENT_CANDIDATES: dict[str, list[CityCandidate]] = {
     "AFRICA": [
@@ -21,6 +51,9 @@ CONTINENT_CANDIDATES: dict[str, list[CityCandidate]] = {
         {"city": "Cape Town", "city_code": "CPT", "country_code": "ZA"},
         {"city": "Nairobi", "city_code": "NBO", "country_code": "KE"},
         {"city": "Marrakesh", "city_code": "RAK", "country_code": "MA"},
+        {"city": "Johannesburg", "city_code": "JNB", "country_code": "ZA"},
+        {"city": "Casablanca", "city_code": "CAS", "country_code": "MA"},
+        {"city": "Zanzibar", "city_code": "ZNZ", "country_code": "TZ"},
     ],
     "EUROPE": [
         {"city": "Paris", "city_code": "PAR", "country_code": "FR"},
@@ -29,6 +62,11 @@ CONTINENT_CANDIDATES: dict[str, list[CityCandidate]] = {
         {"city": "Rome", "city_code": "ROM", "country_code": "IT"},
         {"city": "Amsterdam", "city_code": "AMS", "country_code": "NL"},
         {"city": "Prague", "city_code": "PRG", "country_code": "CZ"},
+        {"city": "Lisbon", "city_code": "LIS", "country_code": "PT"},
+        {"city": "Madrid", "city_code": "MAD", "country_code": "ES"},
+        {"city": "Vienna", "city_code": "VIE", "country_code": "AT"},
+        {"city": "Berlin", "city_code": "BER", "country_code": "DE"},
+        {"city": "Istanbul", "city_code": "IST", "country_code": "TR"},
     ],
     "ASIA": [
         {"city": "Tokyo", "city_code": "NRT", "country_code": "JP"},
@@ -37,24 +75,48 @@ CONTINENT_CANDIDATES: dict[str, list[CityCandidate]] = {
         {"city": "Singapore", "city_code": "SIN", "country_code": "SG"},
         {"city": "Hong Kong", "city_code": "HKG", "country_code": "HK"},
         {"city": "Taipei", "city_code": "TPE", "country_code": "TW"},
+        {"city": "Fukuoka", "city_code": "FUK", "country_code": "JP"},
+        {"city": "Hanoi", "city_code": "HAN", "country_code": "VN"},
+        {"city": "Kuala Lumpur", "city_code": "KUL", "country_code": "MY"},
+        {"city": "Manila", "city_code": "MNL", "country_code": "PH"},
     ],
     "NORTH_AMERICA": [
         {"city": "Los Angeles", "city_code": "LAX", "country_code": "US"},
         {"city": "San Francisco", "city_code": "SFO", "country_code": "US"},
         {"city": "New York", "city_code": "JFK", "country_code": "US"},
         {"city": "Vancouver", "city_code": "YVR", "country_code": "CA"},
+        {"city": "Honolulu", "city_code": "HNL", "country_code": "US"},
+        {"city": "Toronto", "city_code": "YYZ", "country_code": "CA"},
+        {"city": "Mexico City", "city_code": "MEX", "country_code": "MX"},
+        {"city": "Cancun", "city_code": "CUN", "country_code": "MX"},
     ],
     "SOUTH_AMERICA": [
         {"city": "Sao Paulo", "city_code": "GRU", "country_code": "BR"},
         {"city": "Buenos Aires", "city_code": "EZE", "country_code": "AR"},
+        {"city": "Lima", "city_code": "LIM", "country_code": "PE"},
+        {"city": "Bogota", "city_code": "BOG", "country_code": "CO"},
+        {"city": "Santiago", "city_code": "SCL", "country_code": "CL"},
     ],
     "OCEANIA": [
         {"city": "Sydney", "city_code": "SYD", "country_code": "AU"},
         {"city": "Melbourne", "city_code": "MEL", "country_code": "AU"},
         {"city": "Auckland", "city_code": "AKL", "country_code": "NZ"},
+        {"city": "Brisbane", "city_code": "BNE", "country_code": "AU"},
+        {"city": "Nadi", "city_code": "NAN", "country_code": "FJ"},
     ],
 }
 
+# flight-destinations prices metropolitan city codes; these candidates are listed by
+# their main airport, so the pre-rank looks them up under the city's code as well.
+AIRPORT_CITY_CODES: dict[str, str] = {
+    "NRT": "TYO",
+    "KIX": "OSA",
+    "JFK": "NYC",
+    "YYZ": "YTO",
+    "GRU": "SAO",
+    "EZE": "BUE",
+}
+
 
 def compute_request_hash(request: SearchRequestIn) -> str:
     payload = request.model_dump(mode="json")
@@ -63,98 +125,538 @@ def compute_request_hash(request: SearchRequestIn) -> str:
 
 
 def get_city_candidates(continent: str) -> list[CityCandidate]:
-    cities = CONTINENT_CANDIDATES.get(continent.upper())
-    if not cities:
-        raise ValueError(f"Unsupported continent: {continent}")
-    limit = min(max(settings.city_candidates_limit, 1), 5)
-    return cities[:limit]
+    """Return the candidates for one continent, a comma-separated list, or ``ANY``."""
+    names = _continent_names(continent)
+    groups: list[list[CityCandidate]] = []
+    for name in names:
+        cities = CONTINENT_CANDIDATES.get(name)
+        if not cities:
+            raise ValueError(f"Unsupported continent: {name or continent}")
+        groups.append(cities)
+    # Interleaved so that, without pre-ranking prices, a multi-continent search still
+    # samples every continent instead of filling up from the first one.
+    return [city for group in zip_longest(*groups) for city in group if city is not None]
 
 
-def build_recommendations(request: SearchRequestIn) -> list[dict[str, Any]]:
-    flights_client = get_flights_client()
-    hotels_client = get_hotels_client()
-    fx_client = get_fx_client()
-    candidates = get_city_candidates(request.continent)
+def _continent_names(continent: str) -> list[str]:
+    if continent.upper() == "ANY":
+        return list(CONTINENT_CANDIDATES)
+    return [name.strip().upper() for name in continent.split(",")]
 
-    recommendations: list[dict[str, Any]] = []
-    for candidate in candidates:
-        city_code = candidate["city_code"]
-        flight_offers = flights_client.search_offers(
-            origin=request.origin,
-            destination=city_code,
-            date_from=request.date_from,
-            date_to=request.date_to,
-            adults=request.adults,
-            max_stops=_pref_max_stops(request),
-            currency_code=request.currency,
-        )
-        flight_offers = _convert_flight_offers(
-            flight_offers,
-            target_currency=request.currency,
-            fx_client=fx_client,
-        )
 
-        hotel_offers = hotels_client.search_offers(
-            city_code=city_code,
-            check_in=_to_date(request.date_from),
-            check_out=_to_date(request.date_to),
-            adults=request.adults,
-            max_price=None,
-            stars_min=_pref_hotel_stars(request),
-            currency_code=request.currency,
-        )
-        hotel_offers = _convert_hotel_offers(
-            hotel_offers,
-            target_currency=request.currency,
-            fx_client=fx_client,
-        )
+def _candidates_limit(continent: str) -> int:
+    if len(_continent_names(continent)) > 1:
+        return max(settings.global_city_candidates_limit, 1)
+    return max(settings.city_candidates_limit, 1)
 
-        flight_min_total, flight_currency, flight_min_offer_name = _min_flight_total(
-            flight_offers
-        )
-        hotel_min_total, hotel_currency, hotel_min_offer_name = _min_hotel_total(
-            hotel_offers
+
+async def rank_city_candidates(
+    request: SearchRequestIn,
+    candidates: list[CityCandidate],
+    *,
+    flights_client: AsyncAmadeusFlightsClient,
+) -> list[CityCandidate]:
+    """Pick the cities that go through the full offer search.
+
+    Candidates are ordered by the cheapest price Amadeus has cached for the origin and
+    departure month, which is one call per origin and month instead of a flight and two
+    hotel calls per city. Cities without a known price keep their listed order after
+    the priced ones; if the lookup fails, the listed order is used as is.
+    """
+    limit = _candidates_limit(request.continent)
+    if not settings.city_prerank_enabled or len(candidates) <= limit:
+        return candidates[:limit]
+    key = DestinationMonthKey(
+        origin=request.origin,
+        month=request.date_from.strftime("%Y-%m"),
+    )
+    try:
+        prices = await get_cheapest_destinations(flights_client, key)
+    except (httpx.HTTPError, ProviderCallBudgetExceeded, DeadlineExceeded):
+        logger.warning("flight-destinations lookup failed for %s", key, exc_info=True)
+        return candidates[:limit]
+
+    def rank(candidate: CityCandidate) -> tuple[bool, float]:
+        code = candidate["city_code"]
+        price = prices.get(code)
+        if price is None and code in AIRPORT_CITY_CODES:
+            price = prices.get(AIRPORT_CITY_CODES[code])
+        return price is None, price or 0.0
+
+    return sorted(candidates, key=rank)[:limit]
+
+
+class _SearchFx:
+    """Conversion factors into one search's currency, shared by all of its offers.
+
+    The FX snapshot is fetched only once some offer is priced in another currency, and
+    then once per search, so every offer is converted with the same factor table. If
+    the fetch fails, offers already in the search currency are kept and the rest are
+    dropped, as they are when no rate exists.
+    """
+
+    def __init__(self, currency: str) -> None:
+        self.currency = currency.upper()
+        self._factors: dict[str, float] | None = None
+        self._lock = asyncio.Lock()
+
+    async def factors_for(
+        self,
+        offers: Sequence[FlightOfferSummary | HotelOfferSummary],
+    ) -> dict[str, float]:
+        if all((offer.currency or "").upper() == self.currency for offer in offers):
+            return {self.currency: 1.0}
+        async with self._lock:
+            if self._factors is None:
+                self._factors = await self._load_factors()
+        return self._factors
+
+    async def _load_factors(self) -> dict[str, float]:
+        try:
+            snapshot = await get_fx_snapshot(get_fx_client())
+        except (httpx.HTTPError, RuntimeError, DeadlineExceeded):
+            logger.warning(
+                "FX snapshot unavailable; keeping only %s offers",
+                self.currency,
+                exc_info=True,
+            )
+            return {self.currency: 1.0}
+        return snapshot.factors_to(self.currency)
+
+
+async def build_recommendations(
+    request: SearchRequestIn,
+    *,
+    on_city_done: CityDoneCallback | None = None,
+) -> list[dict[str, Any]]:
+    # One semaphore and one provider-call budget span every city, so a multi-continent
+    # or "ANY" search is bounded like a single search rather than once per continent.
+    with provider_call_budget(settings.search_provider_call_budget):
+        return await _build_recommendations(request, on_city_done=on_city_done)
+
+
+async def _build_recommendations(
+    request: SearchRequestIn,
+    *,
+    on_city_done: CityDoneCallback | None,
+) -> list[dict[str, Any]]:
+    flights_client = get_async_flights_client()
+    hotels_client = get_async_hotels_client()
+    candidates = await rank_city_candidates(
+        request,
+        get_city_candidates(request.continent),
+        flights_client=flights_client,
+    )
+    fx = _SearchFx(request.currency)
+
+    # Flight and hotel lookups for every city are independent provider calls, so
+    # they are gathered under a shared semaphore; gather keeps candidate order, which
+    # keeps the ranking deterministic.
+    semaphore = asyncio.Semaphore(max(settings.search_max_concurrency, 1))
+
+    # Each fetch also records its result in ``partial`` so a city cut off by the
+    # deadline can still report whatever finished.
+    async def fetch_flights(
+        candidate: CityCandidate,
+        partial: dict[str, list[Any]],
+    ) -> tuple[list[FlightOffer], bool]:
+        partial["flights"], price_capped = await _fetch_flight_offers(
+            request,
+            candidate["city_code"],
+            flights_client=flights_client,
+            fx=fx,
+            semaphore=semaphore,
         )
-        total_estimate, total_currency = _combine_totals(
-            flight_min_total,
-            flight_currency,
-            hotel_min_total,
-            hotel_currency,
+        return partial["flights"], price_capped
+
+    async def fetch_hotels(
+        candidate: CityCandidate,
+        partial: dict[str, list[Any]],
+    ) -> list[HotelOffer]:
+        partial["hotels"] = await _fetch_hotel_offers(
+            request,
+            candidate["city_code"],
+            hotels_client=hotels_client,
+            fx=fx,
+            semaphore=semaphore,
         )
-        reasons = _build_reasons(
-            request=request,
-            total_estimate=total_estimate,
-            total_currency=total_currency,
-            flight_currency=flight_currency,
-            hotel_currency=hotel_currency,
+        return partial["hotels"]
+
+    prune_above = _prune_threshold(request)
+
+    async def fetch_city(
+        candidate: CityCandidate,
+        partial: dict[str, list[Any]],
+    ) -> tuple[list[FlightOffer], list[HotelOffer], str | None]:
+        if prune_above is None:
+            (flight_offers, _), hotel_offers = await asyncio.gather(
+                fetch_flights(candidate, partial),
+                fetch_hotels(candidate, partial),
+            )
+            return flight_offers, hotel_offers, None
+        # Flights first: a city whose cheapest flight alone blows the budget never
+        # reaches the two hotel calls.
+        flight_offers, price_capped = await fetch_flights(candidate, partial)
+        flight_min_total, _, _ = _min_offer_total(flight_offers)
+        if flight_min_total is not None and flight_min_total > prune_above:
+            return flight_offers, [], "flight alone exceeds budget"
+        if not flight_offers:
+            # Only a price cap that was actually applied makes this a budget prune; an
+            # uncapped empty answer means the route has no flights at all.
+            if price_capped:
+                return flight_offers, [], "no flight within budget"
+            return flight_offers, [], "no flights found"
+        try:
+            hotel_offers = await fetch_hotels(candidate, partial)
+        except ProviderCallBudgetExceeded:
+            return flight_offers, [], "provider call budget exhausted"
+        return flight_offers, hotel_offers, None
+
+    async def city_recommendation(candidate: CityCandidate) -> dict[str, Any]:
+        partial: dict[str, list[Any]] = {}
+        timed_out = False
+        try:
+            flight_offers, hotel_offers, pruned_reason = await run_within_deadline(
+                fetch_city(candidate, partial)
+            )
+        except ProviderCallBudgetExceeded:
+            flight_offers, hotel_offers = [], []
+            pruned_reason = "provider call budget exhausted"
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            flight_offers = partial.get("flights", [])
+            hotel_offers = partial.get("hotels", [])
+            pruned_reason = None
+            timed_out = True
+        recommendation = _build_city_recommendation(
+            request,
+            candidate,
             flight_offers=flight_offers,
+            hotel_offers=hotel_offers,
+            pruned_reason=pruned_reason,
+            timed_out=timed_out,
         )
+        if on_city_done is not None:
+            await on_city_done(recommendation, len(candidates))
+        return recommendation
+
+    recommendations = list(
+        await asyncio.gather(*(city_recommendation(candidate) for candidate in candidates))
+    )
+    _apply_scores(recommendations, budget_total=request.budget_total)
+    return recommendations
+
 
-        recommendations.append(
+async def build_price_calendar(request: PriceCalendarRequestIn) -> dict[str, Any]:
+    """Price every (departure, return) pair within ``flex_days`` of the request per city.
+
+    All pairs share one candidate list, semaphore, provider-call budget and the
+    leg/stay caches. Flights for every pair are fetched first. Hotels are then priced
+    for each city's cheapest-flight pair, and only after that for the other pairs,
+    which are skipped as ``beaten`` once their flight alone costs at least the best
+    complete total found for the city. A provider error marks just its own cell as
+    ``error``; cells the budget or deadline cut off stay ``incomplete``.
+    """
+    with provider_call_budget(settings.search_provider_call_budget):
+        return await _build_price_calendar(request)
+
+
+async def _build_price_calendar(request: PriceCalendarRequestIn) -> dict[str, Any]:
+    flights_client = get_async_flights_client()
+    hotels_client = get_async_hotels_client()
+    candidates = await rank_city_candidates(
+        request,
+        get_city_candidates(request.continent),
+        flights_client=flights_client,
+    )
+    fx = _SearchFx(request.currency)
+    semaphore = asyncio.Semaphore(max(settings.search_max_concurrency, 1))
+    prune_above = _prune_threshold(request)
+    variants = {
+        pair: request.model_copy(update={"date_from": pair[0], "date_to": pair[1]})
+        for pair in _flex_date_pairs(request)
+    }
+    cells = [(pair, candidate) for pair in variants for candidate in candidates]
+    failed_flights: dict[int, str] = {}
+    uncapped_flights: set[int] = set()
+
+    async def price_flights(index: int) -> float | None:
+        pair, candidate = cells[index]
+        try:
+            flight_offers, price_capped = await _fetch_flight_offers(
+                variants[pair],
+                candidate["city_code"],
+                flights_client=flights_client,
+                fx=fx,
+                semaphore=semaphore,
+            )
+        except _CALENDAR_CELL_ERRORS as exc:
+            logger.warning(
+                "calendar flights failed for %s %s", candidate["city_code"], pair, exc_info=True
+            )
+            failed_flights[index] = _calendar_failure_status(exc)
+            return None
+        if not price_capped:
+            uncapped_flights.add(index)
+        flight_min_total, _, _ = _min_offer_total(flight_offers)
+        return flight_min_total
+
+    flight_totals = await asyncio.gather(*(price_flights(index) for index in range(len(cells))))
+
+    best_totals: dict[str, float] = {}
+    # FIFO gate for the hotel stage: cells enter cheapest flight first, so a pricier
+    # pair is checked against the best total found while it waited.
+    hotel_gate = asyncio.Semaphore(max(settings.search_max_concurrency, 1))
+
+    async def price_cell(index: int) -> dict[str, Any]:
+        pair, candidate = cells[index]
+        flight_min_total = flight_totals[index]
+        city_code = candidate["city_code"]
+        cell: dict[str, Any] = {
+            "flight_min_total": flight_min_total,
+            "hotel_min_total": None,
+            "total_estimate": None,
+            "status": "incomplete",
+        }
+        if index in failed_flights:
+            cell["status"] = failed_flights[index]
+            return cell
+        if flight_min_total is None:
+            # Without a flight the pair is over budget only if a price cap removed one.
+            if prune_above is not None and index not in uncapped_flights:
+                cell["status"] = "pruned"
+            return cell
+        if prune_above is not None and flight_min_total > prune_above:
+            cell["status"] = "pruned"
+            return cell
+        async with hotel_gate:
+            best_total = best_totals.get(city_code)
+            if best_total is not None and flight_min_total >= best_total:
+                cell["status"] = "beaten"
+                return cell
+            try:
+                hotel_offers = await _fetch_hotel_offers(
+                    variants[pair],
+                    city_code,
+                    hotels_client=hotels_client,
+                    fx=fx,
+                    semaphore=semaphore,
+                )
+            except _CALENDAR_CELL_ERRORS as exc:
+                logger.warning(
+                    "calendar hotels failed for %s %s", city_code, pair, exc_info=True
+                )
+                cell["status"] = _calendar_failure_status(exc)
+                return cell
+        hotel_min_total, hotel_currency, _ = _min_offer_total(hotel_offers)
+        total_estimate, _ = _combine_totals(
+            flight_min_total, request.currency, hotel_min_total, hotel_currency
+        )
+        cell["hotel_min_total"] = hotel_min_total
+        if total_estimate is not None:
+            cell["total_estimate"] = total_estimate
+            cell["status"] = "priced"
+            if city_code not in best_totals or total_estimate < best_totals[city_code]:
+                best_totals[city_code] = total_estimate
+        return cell
+
+    order = sorted(
+        range(len(cells)),
+        key=lambda index: (flight_totals[index] is None, flight_totals[index] or 0.0),
+    )
+    # Each city's cheapest-flight pair goes first, so every other pair of the city is
+    # checked against a best total that is already known.
+    leading: dict[str, int] = {}
+    for index in order:
+        if flight_totals[index] is not None:
+            leading.setdefault(cells[index][1]["city_code"], index)
+    first_wave = list(leading.values())
+    led = set(first_wave)
+    second_wave = [index for index in order if index not in led]
+    cell_by_index: dict[int, dict[str, Any]] = {}
+    for wave in (first_wave, second_wave):
+        priced = await asyncio.gather(*(price_cell(index) for index in wave))
+        cell_by_index.update(zip(wave, priced))
+
+    matrix: list[dict[str, Any]] = []
+    best: dict[str, Any] | None = None
+    for row, pair in enumerate(variants):
+        row_cells: dict[str, dict[str, Any]] = {}
+        for column, candidate in enumerate(candidates):
+            cell = cell_by_index[row * len(candidates) + column]
+            row_cells[candidate["city_code"]] = cell
+            total_estimate = cell["total_estimate"]
+            if total_estimate is not None and (
+                best is None or total_estimate < best["total_estimate"]
+            ):
+                best = {
+                    "date_from": pair[0].isoformat(),
+                    "date_to": pair[1].isoformat(),
+                    "city_code": candidate["city_code"],
+                    "total_estimate": total_estimate,
+                }
+        matrix.append(
             {
-                "city": candidate["city"],
-                "city_code": city_code,
-                "country_code": candidate["country_code"],
-                "flight": {
-                    "min_total": flight_min_total,
-                    "currency": flight_currency,
-                    "min_offer_name": flight_min_offer_name,
-                    "top_offers": flight_offers,
-                },
-                "hotel": {
-                    "min_total": hotel_min_total,
-                    "currency": hotel_currency,
-                    "min_offer_name": hotel_min_offer_name,
-                    "top_offers": [asdict(offer) for offer in hotel_offers],
-                },
-                "total_estimate": total_estimate,
-                "score": 0.0,
-                "reasons": reasons,
+                "date_from": pair[0].isoformat(),
+                "date_to": pair[1].isoformat(),
+                "cells": row_cells,
             }
         )
 
-    _apply_scores(recommendations)
-    return recommendations
+    return {
+        "search_input": request.model_dump(mode="json"),
+        "flex_days": request.flex_days,
+        "currency": request.currency,
+        "cities": candidates,
+        "matrix": matrix,
+        "best": best,
+    }
+
+
+def _calendar_failure_status(exc: Exception) -> str:
+    if isinstance(exc, (ProviderCallBudgetExceeded, DeadlineExceeded)):
+        return "incomplete"
+    return "error"
+
+
+def _flex_date_pairs(request: PriceCalendarRequestIn) -> list[tuple[date, date]]:
+    shifts = range(-request.flex_days, request.flex_days + 1)
+    today = date.today()
+    pairs: list[tuple[date, date]] = []
+    for departure_shift in shifts:
+        date_from = request.date_from + timedelta(days=departure_shift)
+        for return_shift in shifts:
+            date_to = request.date_to + timedelta(days=return_shift)
+            # Hotels need at least one night, and providers reject past departures.
+            if date_to > date_from and date_from >= today:
+                pairs.append((date_from, date_to))
+    return pairs
+
+
+async def _fetch_flight_offers(
+    request: SearchRequestIn,
+    city_code: str,
+    *,
+    flights_client: AsyncAmadeusFlightsClient,
+    fx: _SearchFx,
+    semaphore: asyncio.Semaphore,
+) -> tuple[list[FlightOffer], bool]:
+    """Return the converted offers and whether a price cap may have removed any.
+
+    The cap counts when it was pushed down as ``maxPrice`` for the fetched (possibly
+    cached) offers, or when it alone left no offers here.
+    """
+    max_stops = _pref_max_stops(request)
+    max_price = _flight_price_cap(request)
+    leg = FlightLegKey(
+        origin=request.origin,
+        destination=city_code,
+        date_from=request.date_from,
+        date_to=request.date_to,
+        adults=request.adults,
+        currency=request.currency,
+        non_stop=max_stops == 0,
+    )
+    async with semaphore:
+        leg_offers = await get_flight_leg_offers(flights_client, leg, max_price=max_price)
+    flight_offers = select_offers(
+        leg_offers,
+        max_stops=max_stops,
+        max_price=max_price,
+        adults=request.adults,
+    )
+    price_capped = leg_offers.max_price is not None
+    if not price_capped and max_price is not None and not flight_offers:
+        # An uncapped cached entry: the cap counts if it is what emptied the list.
+        price_capped = bool(select_offers(leg_offers, max_stops=max_stops, limit=1))
+    converted = _convert_flight_offers(
+        flight_offers,
+        target_currency=request.currency,
+        fx_factors=await fx.factors_for(flight_offers),
+    )
+    return converted, price_capped
+
+
+async def _fetch_hotel_offers(
+    request: SearchRequestIn,
+    city_code: str,
+    *,
+    hotels_client: AsyncAmadeusHotelsClient,
+    fx: _SearchFx,
+    semaphore: asyncio.Semaphore,
+) -> list[HotelOffer]:
+    stay = HotelStayKey(
+        city_code=city_code,
+        check_in=_to_date(request.date_from),
+        check_out=_to_date(request.date_to),
+        adults=request.adults,
+        stars_min=_pref_hotel_stars(request),
+        currency=request.currency,
+    )
+    async with semaphore:
+        hotel_offers = await get_hotel_stay_offers(hotels_client, stay)
+    return _convert_hotel_offers(
+        hotel_offers,
+        target_currency=request.currency,
+        fx_factors=await fx.factors_for(hotel_offers),
+    )
+
+
+def _build_city_recommendation(
+    request: SearchRequestIn,
+    candidate: CityCandidate,
+    *,
+    flight_offers: list[FlightOffer],
+    hotel_offers: list[HotelOffer],
+    pruned_reason: str | None = None,
+    timed_out: bool = False,
+) -> dict[str, Any]:
+    flight_min_total, flight_currency, flight_min_offer_name = _min_offer_total(
+        flight_offers
+    )
+    hotel_min_total, hotel_currency, hotel_min_offer_name = _min_offer_total(
+        hotel_offers
+    )
+    total_estimate, total_currency = _combine_totals(
+        flight_min_total,
+        flight_currency,
+        hotel_min_total,
+        hotel_currency,
+    )
+    reasons = _build_reasons(
+        request=request,
+        total_estimate=total_estimate,
+        total_currency=total_currency,
+        flight_currency=flight_currency,
+        hotel_currency=hotel_currency,
+        flight_offers=flight_offers,
+    )
+    if pruned_reason:
+        reasons.insert(0, pruned_reason)
+    if timed_out:
+        reasons.insert(0, "timed out")
+
+    return {
+        "city": candidate["city"],
+        "city_code": candidate["city_code"],
+        "country_code": candidate["country_code"],
+        "flight": {
+            "min_total": flight_min_total,
+            "currency": flight_currency,
+            "min_offer_name": flight_min_offer_name,
+            "top_offers": [offer.to_dict() for offer in flight_offers],
+        },
+        "hotel": {
+            "min_total": hotel_min_total,
+            "currency": hotel_currency,
+            "min_offer_name": hotel_min_offer_name,
+            "top_offers": [offer.to_dict() for offer in hotel_offers],
+        },
+        "total_estimate": total_estimate,
+        "score": 0.0,
+        "pruned": pruned_reason is not None,
+        "timed_out": timed_out,
+        "reasons": reasons,
+    }
 
 
 def _to_date(value: date) -> date:
@@ -162,24 +664,21 @@ def _to_date(value: date) -> date:
 
 
 def _convert_flight_offers(
-    offers: list[dict[str, Any]],
+    offers: list[FlightOfferSummary],
     *,
     target_currency: str,
-    fx_client: FxRatesClient,
-) -> list[dict[str, Any]]:
-    converted: list[dict[str, Any]] = []
+    fx_factors: dict[str, float],
+) -> list[FlightOffer]:
+    converted: list[FlightOffer] = []
     for offer in offers:
-        currency = offer.get("currency")
-        amount = _parse_money(offer.get("price_total"))
-        if not currency or amount is None:
+        if not offer.currency or offer.price_total is None:
             continue
-        rate = fx_client.get_rate(currency, target_currency)
+        rate = fx_factors.get(offer.currency.upper())
         if rate is None:
             continue
-        converted_offer = dict(offer)
-        converted_offer["currency"] = target_currency
-        converted_offer["price_total"] = round(amount * rate, 2)
-        converted.append(converted_offer)
+        converted.append(
+            ConvertedOffer(offer, target_currency, round(offer.price_total * rate, 2))
+        )
     return converted
 
 
@@ -187,37 +686,47 @@ def _convert_hotel_offers(
     offers: list[HotelOfferSummary],
     *,
     target_currency: str,
-    fx_client: FxRatesClient,
-) -> list[HotelOfferSummary]:
-    converted: list[HotelOfferSummary] = []
+    fx_factors: dict[str, float],
+) -> list[HotelOffer]:
+    converted: list[HotelOffer] = []
     for offer in offers:
         if not offer.currency or offer.price_total is None:
             continue
-        rate = fx_client.get_rate(offer.currency, target_currency)
+        rate = fx_factors.get(offer.currency.upper())
         if rate is None:
             continue
-        price_total = round(offer.price_total * rate, 2)
         price_per_night = (
             round(offer.price_per_night_estimate * rate, 2)
             if offer.price_per_night_estimate is not None
             else None
         )
         converted.append(
-            HotelOfferSummary(
-                id=offer.id,
-                name=offer.name,
-                city_code=offer.city_code,
-                currency=target_currency,
-                price_total=price_total,
-                price_per_night_estimate=price_per_night,
-                rating=offer.rating,
-                address=offer.address,
-                cancellation_policy=offer.cancellation_policy,
+            ConvertedOffer(
+                offer,
+                target_currency,
+                round(offer.price_total * rate, 2),
+                price_per_night,
             )
         )
     return converted
 
 
+def _prune_threshold(request: SearchRequestIn) -> float | None:
+    multiple = settings.prune_flight_budget_multiple
+    if multiple <= 0:
+        return None
+    return request.budget_total * multiple
+
+
+def _flight_price_cap(request: SearchRequestIn) -> int | None:
+    # Offers above the prune threshold could only ever produce a pruned city, so the
+    # threshold is pushed down as Amadeus maxPrice (whole units, per traveler).
+    prune_above = _prune_threshold(request)
+    if prune_above is None:
+        return None
+    return max(math.ceil(prune_above / request.adults), 1)
+
+
 def _pref_max_stops(request: SearchRequestIn) -> int | None:
     if request.preferences:
         return request.preferences.max_stops
@@ -230,38 +739,13 @@ def _pref_hotel_stars(request: SearchRequestIn) -> int | None:
     return None
 
 
-def _min_flight_total(
-    offers: list[dict[str, Any]],
+def _min_offer_total(
+    offers: list[FlightOffer] | list[HotelOffer],
 ) -> tuple[float | None, str | None, str | None]:
-    min_total: float | None = None
-    currency: str | None = None
-    offer_name: str | None = None
-    for offer in offers:
-        value = offer.get("price_total")
-        parsed = _parse_money(value)
-        if parsed is None:
-            continue
-        if min_total is None or parsed < min_total:
-            min_total = parsed
-            currency = offer.get("currency")
-            offer_name = offer.get("name")
-    return min_total, currency, offer_name
-
-
-def _min_hotel_total(
-    offers: list[HotelOfferSummary],
-) -> tuple[float | None, str | None, str | None]:
-    min_total: float | None = None
-    currency: str | None = None
-    offer_name: str | None = None
-    for offer in offers:
-        if offer.price_total is None:
-            continue
-        if min_total is None or offer.price_total < min_total:
-            min_total = offer.price_total
-            currency = offer.currency
-            offer_name = offer.name
-    return min_total, currency, offer_name
+    cheapest = min(offers, key=lambda offer: offer.price_total, default=None)
+    if cheapest is None:
+        return None, None, None
+    return cheapest.price_total, cheapest.currency, cheapest.name
 
 
 def _combine_totals(
@@ -282,29 +766,10 @@ def _combine_totals(
     return round(flight_total + hotel_total, 2), flight_currency
 
 
-def _apply_scores(recommendations: list[dict[str, Any]]) -> None:
-    totals = [
-        rec["total_estimate"]
-        for rec in recommendations
-        if rec.get("total_estimate") is not None
-    ]
-    if not totals:
-        for rec in recommendations:
-            rec["score"] = 0.0
-        return
-
-    min_total = min(totals)
-    max_total = max(totals)
-    for rec in recommendations:
-        total = rec.get("total_estimate")
-        if total is None:
-            rec["score"] = 0.0
-            continue
-        if max_total == min_total:
-            rec["score"] = 1.0
-            continue
-        score = 1 - (total - min_total) / (max_total - min_total)
-        rec["score"] = round(score, 3)
+def _apply_scores(recommendations: list[dict[str, Any]], *, budget_total: float) -> None:
+    scores = score_recommendations(recommendations, budget_total=budget_total)
+    for rec, score in zip(recommendations, scores):
+        rec["score"] = score
 
 
 def _build_reasons(
@@ -314,7 +779,7 @@ def _build_reasons(
     total_currency: str | None,
     flight_currency: str | None,
     hotel_currency: str | None,
-    flight_offers: list[dict[str, Any]],
+    flight_offers: list[FlightOffer],
 ) -> list[str]:
     reasons: list[str] = []
     if flight_currency and flight_currency != request.currency:
@@ -332,17 +797,5 @@ def _build_reasons(
     return reasons
 
 
-def _min_stops(offers: list[dict[str, Any]]) -> int | None:
-    stops = [offer.get("max_stops") for offer in offers if offer.get("max_stops") is not None]
-    if not stops:
-        return None
-    return min(stops)
-
-
-def _parse_money(value: Any) -> float | None:
-    if value is None:
-        return None
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
+def _min_stops(offers: list[FlightOffer]) -> int | None:
+    return min((offer.offer.max_stops for offer in offers), default=None)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.schemas.search import SearchRequestIn
+from app.services.search_service import mark_searches_interrupted, run_search
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SearchJob:
+    payload: SearchRequestIn
+    search_request_id: int
+    request_hash: str
+
+
+class SearchJobQueue:
+    """Bounded queue of background searches drained by a fixed pool of worker tasks."""
+
+    def __init__(self, *, workers: int, max_size: int) -> None:
+        self._workers_count = max(workers, 1)
+        self._max_size = max(max_size, 1)
+        self._queue: asyncio.Queue[SearchJob] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        # search_request ids of the jobs the workers are running.
+        self._active: set[int] = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_size)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"search-job-{index}")
+            for index in range(self._workers_count)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers and fail every unfinished job so its pollers stop waiting."""
+        workers, self._workers = self._workers, []
+        unfinished = list(self._active)
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                unfinished.append(self._queue.get_nowait().search_request_id)
+        self._queue = None
+        self._active.clear()
+        try:
+            await asyncio.to_thread(
+                mark_searches_interrupted,
+                unfinished,
+                {"type": "Shutdown", "message": "server shut down before the search finished"},
+            )
+        except Exception:
+            logger.exception("could not mark %d interrupted search jobs failed", len(unfinished))
+
+    def submit(self, job: SearchJob) -> bool:
+        """Enqueue ``job``; returns ``False`` when the queue is full."""
+        if self._queue is None:
+            self.start()
+        assert self._queue is not None
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            self._active.add(job.search_request_id)
+            try:
+                # The deadline starts when a worker picks the job up, not at enqueue.
+                with deadline_scope(settings.search_deadline_seconds):
+                    await run_search(
+                        job.payload,
+                        job.search_request_id,
+                        job.request_hash,
+                        persist_progress=True,
+                    )
+            except Exception:
+                # run_search already recorded the failure on the search_request row.
+                logger.exception("search job %s failed", job.search_request_id)
+            finally:
+                self._active.discard(job.search_request_id)
+                queue.task_done()
+
+
+search_jobs = SearchJobQueue(
+    workers=settings.search_job_workers,
+    max_size=settings.search_job_queue_size,
+)
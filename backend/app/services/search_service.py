@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.circuit_breaker import circuit_breakers
+from app.core.config import settings
+from app.core.db import NamedLock, SessionLocal
+from app.core.deadline import remaining
+from app.core.single_flight import SingleFlight
+from app.models.search import SearchRequest, SearchResult
+from app.schemas.search import SearchRequestIn
+from app.services.recommend_service import CityDoneCallback, build_recommendations
+
+logger = logging.getLogger(__name__)
+
+_inflight_searches: SingleFlight[str, dict[str, Any]] = SingleFlight()
+
+
+def get_or_create_search_request(
+    db: Session,
+    payload: SearchRequestIn,
+    request_hash: str,
+) -> tuple[SearchRequest, SearchResult | None]:
+    search_request = db.execute(
+        select(SearchRequest).where(SearchRequest.request_hash == request_hash)
+    ).scalar_one_or_none()
+
+    if search_request:
+        cached = get_latest_result(db, search_request.id)
+        if cached and cached.expires_at > _now():
+            return search_request, cached
+        return search_request, None
+
+    search_request = SearchRequest(
+        request_hash=request_hash,
+        payload_json=payload.model_dump(mode="json"),
+        status="created",
+    )
+    db.add(search_request)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request (possibly in another worker) inserted the same hash.
+        db.rollback()
+        search_request = db.execute(
+            select(SearchRequest).where(SearchRequest.request_hash == request_hash)
+        ).scalar_one()
+        return search_request, None
+    db.refresh(search_request)
+    return search_request, None
+
+
+async def run_search(
+    payload: SearchRequestIn,
+    search_request_id: int,
+    request_hash: str,
+    *,
+    on_city_done: CityDoneCallback | None = None,
+    persist_progress: bool = False,
+) -> dict[str, Any]:
+    """Compute and store the result for a search, once per hash across callers.
+
+    ``on_city_done`` only fires when this caller ends up computing the search; callers
+    that join an in-flight or already stored search just get the final payload. With
+    ``persist_progress`` the finished cities are also written to ``progress_json`` for
+    pollers; only background jobs need that, so other callers skip the writes. Such
+    a job's worker also settles the row if the search is cancelled; for any other
+    caller a cancelled search is marked ``failed`` here.
+    """
+    return await _inflight_searches.run(
+        request_hash,
+        lambda: _run_search(
+            payload,
+            search_request_id,
+            request_hash,
+            on_city_done=on_city_done,
+            persist_progress=persist_progress,
+        ),
+    )
+
+
+async def _run_search(
+    payload: SearchRequestIn,
+    search_request_id: int,
+    request_hash: str,
+    *,
+    on_city_done: CityDoneCallback | None,
+    persist_progress: bool,
+) -> dict[str, Any]:
+    # In-process followers already wait on this coroutine; the named lock extends the
+    # single flight to other workers, which then pick up the stored result.
+    lock_timeout = settings.search_lock_timeout_seconds
+    left = remaining()
+    if left is not None:
+        # Waiting on another worker past our own deadline is pointless.
+        lock_timeout = max(min(lock_timeout, int(left)), 0)
+    lock = NamedLock(f"search:{request_hash}", lock_timeout)
+    acquired = await lock.acquire_async()
+    try:
+        if acquired:
+            stored = await asyncio.to_thread(load_fresh_result, search_request_id)
+            if stored is not None:
+                return stored
+        await asyncio.to_thread(
+            _update_status, search_request_id, "running", {"completed": 0, "cities": []}
+        )
+        completed: list[str] = []
+        candidate_count = 0
+        flush_task: asyncio.Task[None] | None = None
+
+        async def flush_progress() -> None:
+            # One writer at a time, off the cities' path; cities finishing during a
+            # write are batched into the next one.
+            written = -1
+            while written != len(completed):
+                written = len(completed)
+                progress = {
+                    "completed": written,
+                    "total": candidate_count,
+                    "cities": completed[:written],
+                }
+                await asyncio.to_thread(
+                    _update_status, search_request_id, "running", progress
+                )
+
+        async def record_progress(recommendation: dict[str, Any], total: int) -> None:
+            nonlocal candidate_count, flush_task
+            if on_city_done is not None:
+                await on_city_done(recommendation, total)
+            completed.append(recommendation["city_code"])
+            candidate_count = total
+            if persist_progress and (flush_task is None or flush_task.done()):
+                flush_task = asyncio.create_task(flush_progress())
+
+        async def settle_progress() -> None:
+            # A progress write landing after the final status would undo it.
+            if flush_task is not None:
+                await asyncio.gather(flush_task, return_exceptions=True)
+
+        try:
+            recommendations = await build_recommendations(
+                payload, on_city_done=record_progress
+            )
+        except asyncio.CancelledError:
+            if persist_progress:
+                # The job worker that cancelled the search owns its final status.
+                if flush_task is not None:
+                    flush_task.cancel()
+            else:
+                # A dropped request or stream leaves nobody else to settle the row.
+                await _mark_cancelled(search_request_id)
+            raise
+        except Exception as exc:
+            await settle_progress()
+            await asyncio.to_thread(
+                _update_status,
+                search_request_id,
+                "failed",
+                {
+                    "completed": len(completed),
+                    "cities": completed,
+                    "error": {"type": type(exc).__name__, "message": str(exc)},
+                },
+            )
+            raise
+        await settle_progress()
+        return await asyncio.to_thread(store_result, search_request_id, recommendations)
+    finally:
+        if acquired:
+            await lock.release_async()
+
+
+def load_fresh_result(search_request_id: int) -> dict[str, Any] | None:
+    with SessionLocal() as db:
+        search_request = db.get(SearchRequest, search_request_id)
+        latest = get_latest_result(db, search_request_id)
+        if search_request is None or latest is None or latest.expires_at <= _now():
+            return None
+        return with_search_input(latest.result_json, search_request.payload_json)
+
+
+def load_stale_result(search_request_id: int) -> dict[str, Any] | None:
+    """Return the latest stored result even if expired, flagged ``stale``."""
+    with SessionLocal() as db:
+        search_request = db.get(SearchRequest, search_request_id)
+        latest = get_latest_result(db, search_request_id)
+        if search_request is None or latest is None:
+            return None
+        payload = with_search_input(latest.result_json, search_request.payload_json)
+    payload["stale"] = True
+    return payload
+
+
+def search_providers_unavailable() -> bool:
+    """True while the Amadeus breaker is open and a search would fail fast."""
+    return circuit_breakers["amadeus"].is_open
+
+
+def store_result(
+    search_request_id: int,
+    recommendations: list[dict[str, Any]],
+) -> dict[str, Any]:
+    fetched_at = _now()
+    ttl_seconds = settings.result_cache_ttl_seconds
+    if any(rec.get("timed_out") for rec in recommendations):
+        # Partial answers are worth serving briefly, not for the full TTL.
+        ttl_seconds = min(ttl_seconds, settings.partial_result_cache_ttl_seconds)
+    expires_at = fetched_at + timedelta(seconds=ttl_seconds)
+    with SessionLocal() as db:
+        search_request = db.get(SearchRequest, search_request_id)
+        response_payload = {
+            "search_id": search_request_id,
+            "status": "done",
+            "fetched_at": fetched_at.isoformat(),
+            "expires_at": expires_at.isoformat(),
+            "search_input": search_request.payload_json,
+            "recommendations": recommendations,
+        }
+        result = SearchResult(
+            search_request_id=search_request_id,
+            result_json=response_payload,
+            fetched_at=fetched_at,
+            expires_at=expires_at,
+        )
+        search_request.status = "done"
+        search_request.progress_json = {
+            "completed": len(recommendations),
+            "total": len(recommendations),
+            "cities": [rec["city_code"] for rec in recommendations],
+        }
+        db.add(result)
+        db.commit()
+    return response_payload
+
+
+def mark_search_queued(search_request_id: int) -> None:
+    _update_status(search_request_id, "running", {"completed": 0, "cities": []})
+
+
+async def _mark_cancelled(search_request_id: int) -> None:
+    try:
+        await asyncio.to_thread(
+            mark_searches_interrupted,
+            [search_request_id],
+            {"type": "Cancelled", "message": "search was cancelled before it finished"},
+        )
+    except Exception:
+        logger.exception("could not mark cancelled search %d failed", search_request_id)
+
+
+def mark_search_failed(search_request_id: int, error: dict[str, Any]) -> None:
+    _update_status(search_request_id, "failed", {"completed": 0, "cities": [], "error": error})
+
+
+def mark_searches_interrupted(search_request_ids: list[int], error: dict[str, Any]) -> None:
+    """Fail the searches among ``search_request_ids`` that are still ``running``."""
+    if not search_request_ids:
+        return
+    with SessionLocal() as db:
+        db.execute(
+            update(SearchRequest)
+            .where(
+                SearchRequest.id.in_(search_request_ids),
+                SearchRequest.status == "running",
+            )
+            .values(
+                status="failed",
+                progress_json={"completed": 0, "cities": [], "error": error},
+            )
+        )
+        db.commit()
+
+
+def _update_status(
+    search_request_id: int,
+    status: str,
+    progress: dict[str, Any],
+) -> None:
+    with SessionLocal() as db:
+        search_request = db.get(SearchRequest, search_request_id)
+        if search_request is None:
+            return
+        search_request.status = status
+        search_request.progress_json = {**progress, "cities": list(progress["cities"])}
+        db.commit()
+
+
+def get_latest_result(db: Session, search_request_id: int) -> SearchResult | None:
+    return db.execute(
+        select(SearchResult)
+        .where(SearchResult.search_request_id == search_request_id)
+        .order_by(SearchResult.fetched_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def with_search_input(result_json: dict, search_payload: dict) -> dict:
+    payload = dict(result_json)
+    payload["search_input"] = search_payload
+    return payload
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,3 +1,3 @@
-from app.core.db import SessionLocal, engine, get_db
+from app.core.db import NamedLock, SessionLocal, engine, get_db
 
-__all__ = ["SessionLocal", "engine", "get_db"]
+__all__ = ["NamedLock", "SessionLocal", "engine", "get_db"]
@@ -8,6 +8,7 @@ const CONTINENTS = [
   { value: "NORTH_AMERICA", label: "North America" },
   { value: "SOUTH_AMERICA", label: "South America" },
   { value: "OCEANIA", label: "Oceania" },
+  { value: "ANY", label: "Anywhere" },
 ];
 
 const ITINERARY_STYLES = [